@@ -15,6 +15,8 @@ export SYS_PY
 
 # Default config path if not provided as $1
 CFG_PATH="${1:-${PROJECT_ROOT}/config/scene_example.toml}"
+# Any further args (e.g. --engine eevee --samples 64) are forwarded to the script
+shift || true
 
 # Optional: sanity checks
 if [[ ! -f "${CFG_PATH}" ]]; then
@@ -25,5 +27,6 @@ fi
 # Run Blender with your entry script; pass args after '--'
 "${BLENDER_BIN}" --background \
   --python-use-system-env \
+  --python-exit-code 1 \
   --python "${PROJECT_ROOT}/src/blender_rgbd_render_seq.py" -- \
-  --config "${CFG_PATH}"
+  --config "${CFG_PATH}" "$@"
@@ -0,0 +1,105 @@
+# src/blender/material_utils.py
+from typing import Dict, Tuple
+
+# --- Third-party (Blender) ---
+import bpy
+
+RGBA = Tuple[float, float, float, float]
+
+# Shared materials keyed on (base_color, roughness): identical objects reuse one
+# datablock/node tree (one shader compile instead of N).
+_MAT_CACHE: Dict[Tuple[RGBA, float], 'bpy.types.Material'] = {}
+
+
+# Principled BSDF input socket indices, resolved once from the first material
+# (avoids per-material string lookups through the socket collection).
+_BSDF_IDX: Dict[str, int] = {}
+
+_BSDF_GROUP_NAME = 'BaseBSDFGroup'
+_GROUP_NODE_NAME = 'BaseBSDF'  # group node inside each material
+
+
+def _bsdf_input_index(bsdf, name: str) -> int:
+    idx = _BSDF_IDX.get(name)
+    if idx is None:
+        idx = next(i for i, sock in enumerate(bsdf.inputs) if sock.name == name)
+        _BSDF_IDX[name] = idx
+    return idx
+
+
+def _new_group_socket(ng, name: str, in_out: str, socket_type: str):
+    if hasattr(ng, 'interface'):  # Blender 4.x
+        return ng.interface.new_socket(name, in_out=in_out, socket_type=socket_type)
+    sockets = ng.inputs if in_out == 'INPUT' else ng.outputs
+    return sockets.new(socket_type, name)
+
+
+def _base_bsdf_group():
+    """Shared shader node group (Color, Roughness) -> Principled BSDF.
+    Every material instances this group, so the BSDF setup is built only once.
+    """
+    ng = bpy.data.node_groups.get(_BSDF_GROUP_NAME)
+    if ng is not None:
+        return ng
+
+    ng = bpy.data.node_groups.new(name=_BSDF_GROUP_NAME, type='ShaderNodeTree')
+    _new_group_socket(ng, 'Color', 'INPUT', 'NodeSocketColor')
+    _new_group_socket(ng, 'Roughness', 'INPUT', 'NodeSocketFloat')
+    _new_group_socket(ng, 'BSDF', 'OUTPUT', 'NodeSocketShader')
+
+    n_in = ng.nodes.new('NodeGroupInput')
+    n_in.location = (-300, 0)
+    bsdf = ng.nodes.new('ShaderNodeBsdfPrincipled')
+    n_out = ng.nodes.new('NodeGroupOutput')
+    n_out.location = (300, 0)
+
+    ng.links.new(
+        n_in.outputs['Color'], bsdf.inputs[_bsdf_input_index(bsdf, 'Base Color')]
+    )
+    ng.links.new(
+        n_in.outputs['Roughness'], bsdf.inputs[_bsdf_input_index(bsdf, 'Roughness')]
+    )
+    ng.links.new(bsdf.outputs['BSDF'], n_out.inputs['BSDF'])
+    return ng
+
+
+def clear_material_cache() -> None:
+    """Forget cached materials (call after the scene/datablocks are reset)."""
+    _MAT_CACHE.clear()
+
+
+def make_material(
+    name: str, base_color: RGBA = (0.8, 0.8, 0.8, 1.0), roughness: float = 0.4
+):
+    """Return a Principled BSDF material, shared across identical parameters.
+    `name` is only used when a new material has to be created.
+    """
+    key = (tuple(float(c) for c in base_color), float(roughness))
+    m = _MAT_CACHE.get(key)
+    if m is not None:
+        return m
+
+    template = next(iter(_MAT_CACHE.values()), None)
+    if template is not None:
+        # copy() duplicates the finished node tree: no default graph to build
+        # and clear, no node/link creation
+        m = template.copy()
+        m.name = name
+    else:
+        # Lightweight material: [shared BSDF group] -> [Material Output]
+        m = bpy.data.materials.new(name=name)
+        m.use_nodes = True
+        nt = m.node_tree
+        nt.nodes.clear()
+        n_grp = nt.nodes.new('ShaderNodeGroup')
+        n_grp.name = _GROUP_NODE_NAME
+        n_grp.node_tree = _base_bsdf_group()
+        n_out = nt.nodes.new('ShaderNodeOutputMaterial')
+        n_out.location = (300, 0)
+        nt.links.new(n_grp.outputs[0], n_out.inputs['Surface'])
+
+    inputs = m.node_tree.nodes[_GROUP_NODE_NAME].inputs
+    inputs[0].default_value = base_color  # Color
+    inputs[1].default_value = roughness  # Roughness
+    _MAT_CACHE[key] = m
+    return m
@@ -0,0 +1,131 @@
+# src/blender/mesh_utils.py
+# Unit primitive geometry built directly via `bpy.data` (no `bpy.ops` operator
+# overhead: no context override, undo push, selection or redraw).
+import math
+from functools import lru_cache
+from typing import List, Tuple
+
+# --- Third-party (Blender) ---
+import bpy
+
+Verts = Tuple[Tuple[float, float, float], ...]
+Faces = Tuple[Tuple[int, ...], ...]
+
+# Same tessellation as the bpy.ops defaults
+CIRCLE_SEGMENTS = 32
+SPHERE_RINGS = 16
+
+# Unit cube centered at origin (outward CCW faces)
+_CUBE_VERTS: Verts = (
+    (-0.5, -0.5, -0.5),
+    (0.5, -0.5, -0.5),
+    (0.5, 0.5, -0.5),
+    (-0.5, 0.5, -0.5),
+    (-0.5, -0.5, 0.5),
+    (0.5, -0.5, 0.5),
+    (0.5, 0.5, 0.5),
+    (-0.5, 0.5, 0.5),
+)
+_CUBE_FACES: Faces = (
+    (0, 3, 2, 1),  # -Z
+    (4, 5, 6, 7),  # +Z
+    (0, 1, 5, 4),  # -Y
+    (2, 3, 7, 6),  # +Y
+    (3, 0, 4, 7),  # -X
+    (1, 2, 6, 5),  # +X
+)
+
+# Unit plane in XY, normal +Z
+_PLANE_VERTS: Verts = (
+    (-0.5, -0.5, 0.0),
+    (0.5, -0.5, 0.0),
+    (0.5, 0.5, 0.0),
+    (-0.5, 0.5, 0.0),
+)
+_PLANE_FACES: Faces = ((0, 1, 2, 3),)
+
+
+def _ring(n: int, radius: float, z: float) -> List[Tuple[float, float, float]]:
+    return [
+        (
+            radius * math.cos(2.0 * math.pi * i / n),
+            radius * math.sin(2.0 * math.pi * i / n),
+            z,
+        )
+        for i in range(n)
+    ]
+
+
+@lru_cache(maxsize=None)
+def _cylinder(segments: int) -> Tuple[Verts, Faces]:
+    """Cylinder radius 0.5, depth 1.0, centered at origin."""
+    n = segments
+    verts = _ring(n, 0.5, -0.5) + _ring(n, 0.5, 0.5)
+    faces = [(i, (i + 1) % n, n + (i + 1) % n, n + i) for i in range(n)]
+    faces.append(tuple(range(n, 2 * n)))  # top cap
+    faces.append(tuple(reversed(range(n))))  # bottom cap
+    return tuple(verts), tuple(faces)
+
+
+@lru_cache(maxsize=None)
+def _cone(segments: int) -> Tuple[Verts, Faces]:
+    """Cone base radius 0.5, depth 1.0, centered at origin, apex at +Z."""
+    n = segments
+    verts = _ring(n, 0.5, -0.5) + [(0.0, 0.0, 0.5)]
+    faces = [(i, (i + 1) % n, n) for i in range(n)]
+    faces.append(tuple(reversed(range(n))))  # base
+    return tuple(verts), tuple(faces)
+
+
+@lru_cache(maxsize=None)
+def _uv_sphere(segments: int, rings: int) -> Tuple[Verts, Faces]:
+    """UV sphere radius 0.5 centered at origin."""
+    verts = [(0.0, 0.0, 0.5)]
+    for j in range(1, rings):
+        phi = math.pi * j / rings
+        verts += _ring(segments, 0.5 * math.sin(phi), 0.5 * math.cos(phi))
+    verts.append((0.0, 0.0, -0.5))
+    top, bottom = 0, len(verts) - 1
+
+    def idx(j: int, i: int) -> int:  # ring j in [0, rings-2]
+        return 1 + j * segments + i % segments
+
+    faces = [(top, idx(0, i), idx(0, i + 1)) for i in range(segments)]
+    for j in range(rings - 2):
+        for i in range(segments):
+            faces.append((idx(j + 1, i), idx(j + 1, i + 1), idx(j, i + 1), idx(j, i)))
+    faces += [
+        (bottom, idx(rings - 2, i + 1), idx(rings - 2, i)) for i in range(segments)
+    ]
+    return tuple(verts), tuple(faces)
+
+
+def primitive_geometry(shape: str) -> Tuple[Verts, Faces]:
+    """Return (verts, faces) of a unit primitive; round shapes are memoized."""
+    if shape == 'cube':
+        return _CUBE_VERTS, _CUBE_FACES
+    if shape == 'plane':
+        return _PLANE_VERTS, _PLANE_FACES
+    if shape == 'cylinder':
+        return _cylinder(CIRCLE_SEGMENTS)
+    if shape == 'sphere':
+        return _uv_sphere(CIRCLE_SEGMENTS, SPHERE_RINGS)
+    if shape == 'cone':
+        return _cone(CIRCLE_SEGMENTS)
+    raise ValueError(f'Unsupported primitive shape: {shape!r}')
+
+
+def make_mesh(name: str, verts: Verts, faces: Faces):
+    """Create a mesh datablock from raw vertex/face arrays."""
+    mesh = bpy.data.meshes.new(name)
+    mesh.from_pydata(verts, [], faces)
+    mesh.update()
+    return mesh
+
+
+def create_primitive_object(name: str, shape: str):
+    """Create and link a unit primitive object (origin-centered)."""
+    verts, faces = primitive_geometry(shape)
+    obj = bpy.data.objects.new(name, make_mesh(name, verts, faces))
+    bpy.context.collection.objects.link(obj)
+    return obj
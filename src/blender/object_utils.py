@@ -6,6 +6,8 @@ from typing import Tuple
 import bpy
 
 # --- Local project modules ---
+from src.blender.material_utils import make_material
+from src.blender.mesh_utils import create_primitive_object
 from src.config.config_types import SE3, ObjectCAD, ObjectPrimitive, ObjectSpec
 from src.utils.math_utils import make_scaled_se3_matrix
 
@@ -13,12 +15,8 @@ Vec3 = Tuple[float, float, float]
 
 
 def _make_material(name: str, base_color=(0.8, 0.8, 0.8, 1.0), roughness: float = 0.4):
-    m = bpy.data.materials.new(name=name)
-    m.use_nodes = True
-    bsdf = m.node_tree.nodes.get('Principled BSDF')
-    bsdf.inputs['Base Color'].default_value = base_color
-    bsdf.inputs['Roughness'].default_value = roughness
-    return m
+    # shared across objects with identical color/roughness
+    return make_material(name, base_color, roughness)
 
 
 # ----------------------------
@@ -36,26 +34,8 @@ def _create_primitive(
 ):
     """Create a primitive by shape and apply SE(3)+scale."""
     shape = shape.lower()
-    # spawn a unit primitive at origin; final size by matrix_world scaling
-    if shape == 'cube':
-        bpy.ops.mesh.primitive_cube_add(size=1.0, location=(0, 0, 0))
-        obj = bpy.context.active_object
-    elif shape == 'cylinder':
-        bpy.ops.mesh.primitive_cylinder_add(radius=0.5, depth=1.0, location=(0, 0, 0))
-        obj = bpy.context.active_object
-    elif shape == 'sphere':
-        bpy.ops.mesh.primitive_uv_sphere_add(radius=0.5, location=(0, 0, 0))
-        obj = bpy.context.active_object
-    elif shape == 'cone':
-        bpy.ops.mesh.primitive_cone_add(radius1=0.5, depth=1.0, location=(0, 0, 0))
-        obj = bpy.context.active_object
-    elif shape == 'plane':
-        bpy.ops.mesh.primitive_plane_add(size=1.0, location=(0, 0, 0))
-        obj = bpy.context.active_object
-    else:
-        raise ValueError(f'Unsupported primitive shape: {shape!r}')
-
-    obj.name = f'{shape.capitalize()}'
+    # build a unit primitive at origin via bpy.data; final size by matrix_world scaling
+    obj = create_primitive_object(f'{shape.capitalize()}', shape)
     obj.pass_index = object_index
 
     # material
@@ -65,15 +45,29 @@ def _create_primitive(
     else:
         obj.data.materials[0] = mat
 
-    # world transform = SE3 * diag(size)
+    # world transform = SE3 * diag(size); unparented, so basis == world
+    # (skips the parent-inverse step of a matrix_world assignment)
     T = make_scaled_se3_matrix(T_WO.p, T_WO.q_wxyz, size)
-    obj.matrix_world = T
+    assert obj.parent is None
+    obj.matrix_basis = T
     return obj
 
 
 # src/blender/object_utils.py 중, 기존 _import_cad_mesh() 교체
 
 
+# Base dir for relative CAD paths, cached per .blend filepath
+_CAD_BASE = {'blend': None, 'base': None}
+
+
+def _cad_base_dir() -> Path:
+    blend = bpy.data.filepath
+    if _CAD_BASE['base'] is None or _CAD_BASE['blend'] != blend:
+        _CAD_BASE['base'] = Path(bpy.path.abspath('//')).resolve()
+        _CAD_BASE['blend'] = blend
+    return _CAD_BASE['base']
+
+
 def _import_cad_mesh(
     path: str,
     scale: Vec3,
@@ -88,10 +82,7 @@ def _import_cad_mesh(
     """
     p = Path(path)
     if not p.is_absolute():
-        base = Path(bpy.path.abspath('//')).resolve()
-        p = (base / p).resolve()
-    if not p.exists():
-        raise FileNotFoundError(f"[CAD] File not found: '{path}' → resolved '{str(p)}'")
+        p = (_cad_base_dir() / p).resolve()
 
     ext = p.suffix.lower()
     if ext in ('.glb', '.gltf'):
@@ -114,17 +105,23 @@ def _import_cad_mesh(
         raise ValueError(f'[CAD] Unsupported file extension: {ext}')
 
     # --- Import and collect only newly created objects
-    before = set(bpy.data.objects)
+    # (pointer ints: cheap hashing, no extra refs to bpy structs)
+    before = {o.as_pointer() for o in bpy.data.objects}
     try:
         result = op(**kwargs)
     except Exception as e:
+        # existence is only checked on failure (saves a stat per import)
+        if not p.exists():
+            raise FileNotFoundError(
+                f"[CAD] File not found: '{path}' → resolved '{str(p)}'"
+            )
         raise RuntimeError(f"[CAD] Import failed for '{str(p)}': {e}")
     if 'FINISHED' not in set(result):
         raise RuntimeError(
             f"[CAD] Import did not finish. path='{str(p)}', result={result}"
         )
 
-    new_objs = [o for o in bpy.data.objects if o not in before]
+    new_objs = [o for o in bpy.data.objects if o.as_pointer() not in before]
     meshes = [o for o in new_objs if o.type == 'MESH']
     if not meshes:
         raise RuntimeError(
@@ -155,8 +152,11 @@ def _import_cad_mesh(
             m.data.materials.append(mat)
 
     # --- Apply world transform on the parent (SE3 * diag(scale))
+    # The EMPTY has no parent, so basis == world. If it is ever reparented,
+    # assign matrix_world instead.
     T = make_scaled_se3_matrix(T_WO.p, T_WO.q_wxyz, scale)
-    parent.matrix_world = T
+    assert parent.parent is None
+    parent.matrix_basis = T
 
     return parent
 
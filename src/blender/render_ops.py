@@ -1,8 +1,43 @@
 import os
+import re
 
 # --- Third-party (Blender) ---
 import bpy
 
+# Cycles GPU backends in order of preference
+GPU_BACKENDS = ('OPTIX', 'CUDA', 'HIP', 'ONEAPI', 'METAL')
+
+# Cycles device lists keyed on (compute backend, preferences pointer):
+# device probing is slow and repeated probes may disagree.
+_DEVICE_CACHE: dict = {}
+
+
+def _enumerate_cycles_devices(cprefs) -> tuple:
+    """Return (backend, [(type, name, device), ...]) for the current backend.
+    `refresh_devices()` (or `get_devices()` on builds without it) only runs on a
+    miss.
+    """
+    backend = getattr(cprefs, 'compute_device_type', 'NONE')
+    key = (backend, cprefs.as_pointer())
+    hit = _DEVICE_CACHE.get(key)
+    if hit is None:
+        # refresh_devices() only re-probes the current backend; get_devices()
+        # probes every backend on older builds
+        try:
+            cprefs.refresh_devices()
+        except Exception:
+            try:
+                cprefs.get_devices()
+            except Exception:
+                pass
+        devices = [
+            (d.type, getattr(d, 'name', 'Unknown'), d)
+            for d in getattr(cprefs, 'devices', [])
+        ]
+        hit = (backend, devices)
+        _DEVICE_CACHE[key] = hit
+    return hit
+
 
 def set_render_settings(
     width: int,
@@ -10,12 +45,24 @@ def set_render_settings(
     engine: str = 'CYCLES',
     quality: str = 'balanced',
     device: str = 'GPU',
+    samples: int | None = None,
+    use_cpu_with_gpu: bool = False,
+    device_indices: list[int] | None = None,
+    persistent_data: bool = True,
 ):
     """
     Configure render engine and quality-speed tradeoffs.
-    engine: "CYCLES" | "BLENDER_EEVEE"
+    engine: "CYCLES" | "BLENDER_EEVEE" (mapped to this build's EEVEE id)
     quality: "draft" | "balanced" | "high"
     device: "CPU" | "GPU"
+    samples: optional override of the preset's Cycles (or EEVEE TAA) sample count
+    use_cpu_with_gpu: also render on CPU devices alongside the chosen GPU backend
+    device_indices: GPU indices to enable (None: all). CUDA_VISIBLE_DEVICES /
+      HIP_VISIBLE_DEVICES are applied by the driver first, which renumbers the
+      visible devices from 0, so indices refer to the visible set.
+    persistent_data: keep BVH/textures/kernels resident between renders (Cycles).
+      Only the cameras may change between frames; disable on memory-tight GPUs.
+    Returns a short description of the devices actually used (for the summary).
     """
     scene = bpy.context.scene
 
@@ -26,12 +73,16 @@ def set_render_settings(
     scene.display_settings.display_device = 'sRGB'
     scene.view_settings.view_transform = 'Filmic'
     scene.view_settings.look = 'None'
+    # Frames are independent stills: motion blur would only add per-frame
+    # motion-step data (and blur across --animation keyframes)
+    scene.render.use_motion_blur = False
 
     req_engine = engine.upper().strip()
     req_device = device.upper().strip()
 
     if req_engine == 'CYCLES':
         scene.render.engine = 'CYCLES'
+        gpu_backend = None  # set once a GPU backend is actually enabled
 
         # ---- GPU path (robust) ----
         if req_device == 'GPU':
@@ -39,41 +90,51 @@ def set_render_settings(
                 prefs = bpy.context.preferences
                 cprefs = prefs.addons['cycles'].preferences
 
-                # 1) Pick first available backend
-                for backend in ['OPTIX', 'CUDA', 'HIP', 'ONEAPI', 'METAL']:
+                # 1) Pick the first backend that actually has a matching device
+                #    (assigning compute_device_type succeeds even without hardware)
+                chosen, devices = None, []
+                for backend in GPU_BACKENDS:
                     try:
                         cprefs.compute_device_type = backend
-                        break
                     except Exception:
                         continue
+                    _, devices = _enumerate_cycles_devices(cprefs)
+                    if any(t == backend for t, _, _ in devices):
+                        chosen = backend
+                        break
 
-                # 2) Refresh device list (version-safe)
-                try:
-                    cprefs.get_devices()
-                except Exception:
-                    try:
-                        cprefs.refresh_devices()
-                    except Exception:
-                        pass
-
-                # 3) Enable all devices discovered
-                enabled_devices = []
-                try:
-                    for d in cprefs.devices:
-                        d.use = True
-                        enabled_devices.append(
-                            f'{d.type}:{getattr(d, "name", "Unknown")}'
-                        )
-                except Exception:
-                    enabled_devices = []
-
-                # 4) If any GPU-like device is enabled, use GPU; else fallback to CPU
-                gpu_enabled = any(
-                    x.startswith(('OPTIX', 'CUDA', 'HIP', 'ONEAPI', 'METAL'))
-                    for x in enabled_devices
-                )
+                # 2) Enable devices of the chosen backend (CPU only if requested).
+                #    GPU indices follow the stable device-id order, not enumeration.
+                gpu_enabled = False
+                if chosen is not None:
+                    gpus = sorted(
+                        (d for d in devices if d[0] == chosen),
+                        key=lambda x: getattr(x[2], 'id', x[1]),
+                    )
+                    selected = set(range(len(gpus)))
+                    if device_indices is not None:
+                        selected &= set(device_indices)
+                    for idx, (_, _, d) in enumerate(gpus):
+                        d.use = idx in selected
+                        if d.use:
+                            gpu_enabled = True
+                    for dtype, _, d in devices:
+                        if dtype == 'CPU':
+                            d.use = use_cpu_with_gpu
+                    visible = {
+                        k: os.environ[k]
+                        for k in ('CUDA_VISIBLE_DEVICES', 'HIP_VISIBLE_DEVICES')
+                        if k in os.environ
+                    }
+                    print(
+                        f'[INFO] GPU indices     : {sorted(selected)} of {len(gpus)}'
+                        + (f' (driver-filtered by {visible})' if visible else '')
+                    )
+
+                # 3) If any GPU device is enabled, use GPU; else fallback to CPU
                 if gpu_enabled:
                     scene.cycles.device = 'GPU'
+                    gpu_backend = chosen
                 else:
                     print('[WARN] No usable Cycles GPU devices; falling back to CPU.')
                     scene.cycles.device = 'CPU'
@@ -110,7 +171,9 @@ def set_render_settings(
                 samples=32,
                 use_adaptive_sampling=True,
                 adaptive_threshold=0.05,
+                adaptive_min_samples=8,
                 denoise=True,
+                denoising_prefilter='FAST',
                 max_bounces=3,
                 diffuse_bounces=1,
                 glossy_bounces=1,
@@ -126,7 +189,9 @@ def set_render_settings(
                 samples=128,
                 use_adaptive_sampling=True,
                 adaptive_threshold=0.02,
+                adaptive_min_samples=16,
                 denoise=True,
+                denoising_prefilter='ACCURATE',
                 max_bounces=6,
                 diffuse_bounces=2,
                 glossy_bounces=2,
@@ -142,7 +207,9 @@ def set_render_settings(
                 samples=512,
                 use_adaptive_sampling=True,
                 adaptive_threshold=0.01,
+                adaptive_min_samples=32,
                 denoise=True,
+                denoising_prefilter='ACCURATE',
                 max_bounces=12,
                 diffuse_bounces=4,
                 glossy_bounces=4,
@@ -157,7 +224,7 @@ def set_render_settings(
         }
         p = presets.get(quality, presets['balanced'])
 
-        scene.cycles.samples = p['samples']
+        scene.cycles.samples = samples if samples and samples > 0 else p['samples']
         scene.cycles.use_adaptive_sampling = p['use_adaptive_sampling']
         scene.cycles.adaptive_threshold = p['adaptive_threshold']
         scene.cycles.max_bounces = p['max_bounces']
@@ -168,10 +235,24 @@ def set_render_settings(
         scene.cycles.caustics_reflective = p['caustics_reflective']
         scene.cycles.caustics_refractive = p['caustics_refractive']
 
+        # explicit floor: 0 lets Cycles pick one from the noise threshold
+        scene.cycles.adaptive_min_samples = p['adaptive_min_samples']
+
         try:
             scene.view_layers[0].cycles.use_denoising = p['denoise']
         except Exception:
             pass
+        # Keep denoising on the render GPU: OptiX on NVIDIA, otherwise OIDN
+        # (GPU-accelerated where the build supports it) instead of CPU OIDN
+        try:
+            scene.cycles.denoiser = (
+                'OPTIX' if gpu_backend == 'OPTIX' else 'OPENIMAGEDENOISE'
+            )
+            scene.cycles.denoising_prefilter = p['denoising_prefilter']
+            if hasattr(scene.cycles, 'denoising_use_gpu'):  # Blender 4.1+
+                scene.cycles.denoising_use_gpu = gpu_backend is not None
+        except Exception:
+            pass
 
         scene.render.use_simplify = p['use_simplify']
         scene.render.simplify_subdivision = p['simplify_subdivision']
@@ -180,14 +261,51 @@ def set_render_settings(
         except Exception:
             pass
 
+        # Tile size per device: GPUs need large tiles to stay saturated, CPU
+        # threads balance better on small ones
+        on_gpu = scene.cycles.device == 'GPU'
+        try:
+            if hasattr(scene.render, 'tile_x'):  # Blender < 3.0
+                scene.render.tile_x = scene.render.tile_y = 256 if on_gpu else 32
+            else:
+                scene.cycles.use_auto_tile = True
+                scene.cycles.tile_size = 2048 if on_gpu else 64
+        except Exception:
+            pass
+
+        # Static scene, moving cameras: skip per-frame BVH rebuild/texture upload.
+        # Camera moves do not invalidate the BVH, so all frames share one build;
+        # that makes the slower but tighter spatial-split BVH worth it (CPU/
+        # Embree builds; OptiX builds its own BVH and ignores the flag).
+        try:
+            scene.render.use_persistent_data = persistent_data
+            scene.cycles.debug_use_spatial_splits = persistent_data
+        except Exception:
+            pass
+
     else:
-        # EEVEE
-        scene.render.engine = 'BLENDER_EEVEE'
+        # EEVEE ('BLENDER_EEVEE_NEXT' in 4.2-4.4, 'BLENDER_EEVEE' otherwise)
+        for eevee_id in ('BLENDER_EEVEE_NEXT', 'BLENDER_EEVEE'):
+            try:
+                scene.render.engine = eevee_id
+                break
+            except TypeError:
+                continue
+        # TAA samples per quality; the raster cost scales ~linearly with them
+        taa = {'draft': 16, 'balanced': 64, 'high': 256}
+        scene.eevee.taa_render_samples = (
+            samples if samples and samples > 0 else taa.get(quality, 64)
+        )
+        try:
+            scene.eevee.use_gtao = True  # cheap contact shadows for the room
+        except AttributeError:
+            pass
         scene.render.image_settings.file_format = 'PNG'
         scene.render.image_settings.color_mode = 'RGB'
 
     # ---- Print final state ----
     print('[INFO] Render engine   :', scene.render.engine)
+    device_desc = 'N/A'
 
     if scene.render.engine == 'CYCLES':
         print('[INFO] Cycles device   :', getattr(scene.cycles, 'device', 'UNKNOWN'))
@@ -195,37 +313,139 @@ def set_render_settings(
         enabled = []
         try:
             cprefs = bpy.context.preferences.addons['cycles'].preferences
-            backend = getattr(cprefs, 'compute_device_type', 'UNKNOWN')
-            # refresh list to report accurately
-            try:
-                cprefs.get_devices()
-            except Exception:
-                try:
-                    cprefs.refresh_devices()
-                except Exception:
-                    pass
-            for d in getattr(cprefs, 'devices', []):
-                if getattr(d, 'use', False):
-                    enabled.append(f'{d.type}:{getattr(d, "name", "Unknown")}')
+            # reuse the device list enumerated during setup (no second probe)
+            backend, devices = _enumerate_cycles_devices(cprefs)
+            enabled = [f'{t}:{n}' for t, n, d in devices if getattr(d, 'use', False)]
         except Exception:
             pass
         print('[INFO] Compute backend :', backend)
         print('[INFO] Enabled devices :', ', '.join(enabled) if enabled else '(none)')
+        device_desc = scene.cycles.device
+        if scene.cycles.device == 'GPU' and enabled:
+            device_desc = f'GPU[{backend}] ' + ', '.join(
+                n.split(':', 1)[1] for n in enabled
+            )
+        print('[INFO] Denoiser        :', getattr(scene.cycles, 'denoiser', 'UNKNOWN'))
     else:
         print('[INFO] Cycles device   : N/A')
         print('[INFO] Compute backend : N/A')
         print('[INFO] Enabled devices : (none)')
+    return device_desc
 
 
-def _setup_depth_exr(depth_exr_path: str) -> None:
-    """Configure compositor to write Z to EXR."""
+def _set_depth_sampling(scene, samples: int | None) -> tuple | None:
+    """Lower Cycles samples, disable denoising and bounces for depth/mask renders.
+    Depth and object-index passes are deterministic, so the RGB sample count
+    and the denoiser only cost time (and the denoiser may blur ID edges).
+    Returns the previous state for `_restore_depth_sampling`.
+    """
+    if scene.render.engine != 'CYCLES':
+        return None
+    prev = (
+        scene.cycles.samples,
+        _get_denoising(scene),
+        scene.cycles.max_bounces,
+        scene.cycles.use_adaptive_sampling,
+    )
+    if samples and samples > 0:
+        scene.cycles.samples = samples
+        # nothing to adapt on a deterministic pass; skips the noise estimation
+        scene.cycles.use_adaptive_sampling = False
+    _set_denoising(scene, False)
+    # Z and object index come from the camera rays alone: no bounce is ever
+    # needed, which makes the pass close to a rasterized depth render
+    scene.cycles.max_bounces = 0
+    return prev
+
+
+def _restore_depth_sampling(scene, prev: tuple | None) -> None:
+    if prev is None:
+        return
+    scene.cycles.samples = prev[0]
+    _set_denoising(scene, prev[1])
+    scene.cycles.max_bounces = prev[2]
+    scene.cycles.use_adaptive_sampling = prev[3]
+
+
+def _get_denoising(scene) -> bool:
+    try:
+        return bool(scene.view_layers[0].cycles.use_denoising)
+    except Exception:
+        return False
+
+
+def _set_denoising(scene, enabled: bool) -> None:
+    try:
+        scene.view_layers[0].cycles.use_denoising = enabled
+    except Exception:
+        pass
+
+
+_TRAILING_DIGITS = re.compile(r'^(.*?)(\d+)$')
+
+
+def _frame_template(out_path: str) -> tuple | None:
+    """('frame_####', 42) for '<dir>/frame_0042.ext'; None without trailing digits."""
+    m = _TRAILING_DIGITS.match(os.path.splitext(os.path.basename(out_path))[0])
+    if m is None:
+        return None
+    return m.group(1) + '#' * len(m.group(2)), int(m.group(2))
+
+
+def update_output_path(n_out, out_path: str, template: str | None = None) -> None:
+    """Point a File Output node at `out_path`.
+    With a '#' `template` (see `_frame_template`) and the scene on that frame,
+    the node writes `out_path` itself; otherwise it writes
+    <dir>/<stem>_<frame>.ext, to be renamed by `finalize_file_output`.
+    """
+    base_dir, name = os.path.split(out_path)
+    if n_out.base_path != base_dir:  # constant across a sequence
+        n_out.base_path = base_dir
+    slot = n_out.file_slots[0]
+    path = template or os.path.splitext(name)[0] + '_'
+    if slot.path != path:  # a template is constant across a sequence too
+        slot.path = path
+
+
+def _set_exr_format(n_out, color_depth: str, codec: str) -> None:
+    """Depth EXR precision ('16' half / '32' float) and codec (e.g. ZIP, lossless)."""
+    n_out.format.color_depth = color_depth
+    n_out.format.exr_codec = codec
+
+
+# Arguments of the last built depth/mask graph (nodes are looked up by name)
+_COMPOSITOR_CACHE: dict = {}
+
+
+def build_depth_mask_compositor(
+    object_index: int = 1,
+    exr_depth: str = '32',
+    exr_codec: str = 'ZIPS',
+) -> tuple:
+    """Build the compositor graph writing Z to EXR and an ID mask PNG.
+    Call once per sequence; per frame only `update_output_path` is needed.
+    exr_depth: '32' (float) | '16' (half: ~4 mm steps at 6 m, half the size)
+    Returns the (depth EXR, mask PNG) File Output nodes. Re-invoking it with
+    the same arguments returns the existing nodes instead of rebuilding.
+    """
     scene = bpy.context.scene
+    key = (scene.as_pointer(), object_index, exr_depth, exr_codec)
+    ntree = scene.node_tree
+    if _COMPOSITOR_CACHE.get('key') == key and ntree is not None:
+        nodes = (ntree.nodes.get('DepthEXR'), ntree.nodes.get('ObjMaskPNG'))
+        if None not in nodes:  # graph survived (no scene reset since)
+            return nodes
+
+    prev_use_nodes = scene.use_nodes
     scene.use_nodes = True
 
-    # 1) activate z pass first (blender 4.x)
+    # 1) activate z and object index passes first (blender 4.x); toggling a
+    # pass rebuilds the view layer, so only write/update when one was off
     view_layer = scene.view_layers[0]
-    view_layer.use_pass_z = True
-    bpy.context.view_layer.update()
+    if not (view_layer.use_pass_z and view_layer.use_pass_object_index):
+        view_layer.use_pass_z = True
+        view_layer.use_pass_object_index = True
+        bpy.context.view_layer.update()
 
     # 2) initialize node tree
     ntree = scene.node_tree
@@ -234,132 +454,255 @@ def _setup_depth_exr(depth_exr_path: str) -> None:
 
     # 3) Create RLayers node
     n_rl = ntree.nodes.new('CompositorNodeRLayers')
-    n_rl.location = (-300, 0)
+    n_rl.location = (-400, 0)
 
     # If depth socket does not exist, recreate node to force
-    if 'Depth' not in [s.name for s in n_rl.outputs]:
+    if 'Depth' not in n_rl.outputs:  # native keyed lookup, no name list
         ntree.nodes.remove(n_rl)
         bpy.context.view_layer.update()
         n_rl = ntree.nodes.new('CompositorNodeRLayers')
-        n_rl.location = (-300, 0)
-
-    # Remove old output nodes except RLayers
-    for n in list(ntree.nodes):
-        if n.bl_idname != 'CompositorNodeRLayers':
-            ntree.nodes.remove(n)
+        n_rl.location = (-400, 0)
 
     # Export EXR (raw meters)
     n_exr = ntree.nodes.new('CompositorNodeOutputFile')
-    n_exr.label = 'DepthEXR'
+    n_exr.name = n_exr.label = 'DepthEXR'
     n_exr.format.file_format = 'OPEN_EXR'
-    n_exr.format.color_depth = '32'
-    n_exr.base_path = os.path.dirname(depth_exr_path)
-    base_exr = os.path.splitext(os.path.basename(depth_exr_path))[0]
-    n_exr.file_slots[0].path = base_exr + '_'
+    n_exr.format.color_mode = 'BW'  # depth is 1 channel; don't write RGBA copies
+    _set_exr_format(n_exr, exr_depth, exr_codec)
+    n_exr.location = (150, 150)
+
+    # Object mask: RLayers "IndexOB" -> Math COMPARE -> 8-bit single-channel PNG
+    # (|IndexOB - index| <= 0.5 gives 0/1 per pixel; unlike IDMask no separate
+    # mask operation/buffer, and integer indices make the test exact)
+    n_id = ntree.nodes.new('CompositorNodeMath')
+    n_id.name = 'ObjMaskID'
+    n_id.operation = 'COMPARE'
+    n_id.inputs[1].default_value = float(object_index)
+    n_id.inputs[2].default_value = 0.5  # epsilon
+    n_id.location = (-150, -150)
+
+    n_mask = ntree.nodes.new('CompositorNodeOutputFile')
+    n_mask.name = n_mask.label = 'ObjMaskPNG'
+    n_mask.format.file_format = 'PNG'
+    n_mask.format.color_mode = 'BW'  # single-channel
+    n_mask.format.color_depth = '8'  # 0 or 255
+    n_mask.location = (150, -150)
+    try:
+        # mask must stay exactly 0/255 even when the scene uses Filmic (RGB pass)
+        n_mask.format.color_management = 'OVERRIDE'
+        n_mask.format.view_settings.view_transform = 'Standard'
+    except Exception:
+        pass
+
+    # Main render result = combined image (the RGB when cameras coincide)
+    n_comp = ntree.nodes.new('CompositorNodeComposite')
+    n_comp.location = (150, 350)
 
     # Link (ensure existence of depth socket now)
     ntree.links.new(n_rl.outputs['Depth'], n_exr.inputs[0])
-
-
-def render_depth_exr(depth_exr_path: str, cam_obj) -> None:
-    """Render depth to an EXR image."""
+    ntree.links.new(n_rl.outputs['IndexOB'], n_id.inputs[0])
+    ntree.links.new(n_id.outputs[0], n_mask.inputs[0])
+    ntree.links.new(n_rl.outputs['Image'], n_comp.inputs['Image'])
+
+    # Graph stays in place; it only runs while a depth/mask render enables nodes
+    scene.use_nodes = prev_use_nodes
+    _COMPOSITOR_CACHE['key'] = key
+    return n_exr, n_mask
+
+
+def _assign(owner, attr: str, value) -> None:
+    """Set an RNA property only if it changes (every write fires its update)."""
+    if getattr(owner, attr) != value:
+        setattr(owner, attr, value)
+
+
+def render_depth_and_mask(
+    depth_exr_path: str,
+    mask_png_path: str,
+    cam_obj,
+    out_nodes: tuple,
+    samples: int | None = None,
+    rgb_path: str | None = None,
+) -> None:
+    """Render depth EXR and object mask PNG with a single render call.
+    Both outputs come from the same camera (the depth camera), so one
+    BVH build/trace serves both passes (low samples, no denoising).
+    If `rgb_path` is given (color and depth cameras coincide), the same render
+    also writes the RGB image, at full RGB quality settings.
+    `out_nodes` comes from `build_depth_mask_compositor`.
+    Output stems ending in the same number (frame_0042) are written in place:
+    the scene is moved to that frame and the File Output paths become '#'
+    templates, so no per-frame rename is needed (the scene stays on it).
+    """
     scene = bpy.context.scene
+    render, view = scene.render, scene.view_settings
     prev_camera = scene.camera
     prev_use_nodes = scene.use_nodes
-    prev_filepath = scene.render.filepath
-    tmp_path = os.path.join(os.path.dirname(depth_exr_path), '__tmp_depth_main.png')
+    prev_filepath = render.filepath
+    prev_view_transform = view.view_transform
+    prev_sampling = None if rgb_path else _set_depth_sampling(scene, samples)
+    n_exr, n_mask = out_nodes
+    # State is only written when it differs: with the camera and nodes already
+    # set up by the caller (single-pass sequences) these are no-ops per frame
     try:
-        scene.camera = cam_obj
-        scene.render.filepath = tmp_path
-        _setup_depth_exr(depth_exr_path)
-        bpy.ops.render.render(write_still=True)
-        finalize_file_output(depth_exr_path)
+        _assign(scene, 'camera', cam_obj)
+        if rgb_path:
+            render.filepath = rgb_path
+        else:
+            # No Filmic tone mapping for data passes: saves the per-pixel LUT and
+            # keeps the 8-bit mask at exactly 0/255
+            _assign(view, 'view_transform', 'Standard')
+        _assign(scene, 'use_nodes', True)
+        tmpl = _frame_template(depth_exr_path)
+        if tmpl is not None and _frame_template(mask_png_path) != tmpl:
+            tmpl = None
+        if tmpl is not None:
+            _assign(scene, 'frame_current', tmpl[1])
+        update_output_path(n_exr, depth_exr_path, tmpl and tmpl[0])
+        update_output_path(n_mask, mask_png_path, tmpl and tmpl[0])
+        # File Output nodes write during compositing; the main image is only
+        # saved when it is the RGB (no throwaway PNG encode + delete otherwise)
+        bpy.ops.render.render(write_still=bool(rgb_path))
+        if tmpl is None:  # produced <name>_<frame>.ext
+            finalize_file_output(depth_exr_path)
+            finalize_file_output(mask_png_path)
     finally:
-        if os.path.exists(tmp_path):
-            try:
-                os.remove(tmp_path)
-            except Exception as e:
-                print(f'[WARN] failed to remove tmp: {e}')
-        scene.camera = prev_camera
-        scene.use_nodes = prev_use_nodes
-        scene.render.filepath = prev_filepath
-
-
-def setup_mask_compositor(mask_png_path: str, object_index: int = 1):
-    """Build compositor graph to output an 8-bit single-channel ID mask PNG."""
-    scene = bpy.context.scene
-    scene.use_nodes = True
-    nt = scene.node_tree
-    nt.links.clear()
-    nt.nodes.clear()
+        _assign(scene, 'camera', prev_camera)
+        _assign(scene, 'use_nodes', prev_use_nodes)
+        _assign(render, 'filepath', prev_filepath)
+        _assign(view, 'view_transform', prev_view_transform)
+        _restore_depth_sampling(scene, prev_sampling)
 
-    n_rl = nt.nodes.new('CompositorNodeRLayers')
-    n_rl.location = (-400, 0)
 
-    # Enable Object Index pass
-    view_layer = scene.view_layers[0]
-    view_layer.use_pass_object_index = True
+def frame_pattern(prefix: str = 'frame_', digits: int = 4) -> str:
+    """Output stem for animation renders: Blender expands the '#' run to the
+    zero-padded frame number (same width as the per-frame loop stems)."""
+    return prefix + '#' * digits
 
-    n_id = nt.nodes.new('CompositorNodeIDMask')
-    n_id.index = object_index
-    n_id.location = (-150, 0)
 
-    n_out = nt.nodes.new('CompositorNodeOutputFile')
-    n_out.label = 'ObjMaskPNG'
-    n_out.format.file_format = 'PNG'
-    n_out.format.color_mode = 'BW'  # single-channel
-    n_out.format.color_depth = '8'  # 0 or 255
-    n_out.base_path = os.path.dirname(mask_png_path)
-    base_png = os.path.splitext(os.path.basename(mask_png_path))[0]
-    n_out.file_slots[0].path = base_png + '_'  # will produce <name>_0001.png
-    n_out.location = (150, 0)
+def _set_frame_range(scene, frames: range) -> tuple:
+    prev = (scene.frame_start, scene.frame_end, scene.frame_step)
+    scene.frame_start = frames.start
+    scene.frame_end = frames[-1]
+    scene.frame_step = frames.step
+    return prev
 
-    # Links: RLayers "IndexOB" -> IDMask -> FileOutput
-    nt.links.new(n_rl.outputs['IndexOB'], n_id.inputs['ID value'])
-    nt.links.new(n_id.outputs['Alpha'], n_out.inputs[0])
 
-    return n_out
+def _restore_frame_range(scene, prev: tuple) -> None:
+    scene.frame_start, scene.frame_end, scene.frame_step = prev
 
 
-def render_obj_mask(mask_png_path: str, cam_obj, object_index: int = 1):
-    """Render an object mask (from depth camera view) to a single-channel PNG."""
+def render_rgb_animation(rgb_dir: str, cam_obj, frames: range, digits: int = 4) -> None:
+    """Render RGB for all `frames` with one animation render.
+    Camera poses must be animated per frame (e.g. `bake_frame_poses`).
+    Writes <rgb_dir>/frame_<k:0{digits}d>.png directly (no rename).
+    """
+    scene = bpy.context.scene
+    prev_camera = scene.camera
+    prev_filepath = scene.render.filepath
+    prev_range = _set_frame_range(scene, frames)
+    try:
+        scene.camera = cam_obj
+        scene.render.filepath = os.path.join(rgb_dir, frame_pattern(digits=digits))
+        bpy.ops.render.render(animation=True)
+    finally:
+        scene.camera = prev_camera
+        scene.render.filepath = prev_filepath
+        _restore_frame_range(scene, prev_range)
+
+
+def _set_scratch_image_format(scene) -> tuple:
+    """Cheapest main-image format (8-bit grayscale PNG, no compression) for
+    renders whose main output is discarded. Returns the previous settings."""
+    ims = scene.render.image_settings
+    prev = (ims.file_format, ims.color_mode, ims.color_depth, ims.compression)
+    ims.file_format = 'PNG'
+    ims.color_mode = 'BW'
+    ims.color_depth = '8'
+    ims.compression = 0
+    return prev
+
+
+def _restore_image_format(scene, prev: tuple) -> None:
+    ims = scene.render.image_settings
+    ims.file_format, ims.color_mode, ims.color_depth, ims.compression = prev
+
+
+def render_depth_and_mask_animation(
+    depth_dir: str,
+    mask_dir: str,
+    cam_obj,
+    out_nodes: tuple,
+    frames: range,
+    samples: int | None = None,
+    rgb_dir: str | None = None,
+    digits: int = 4,
+) -> None:
+    """Animation counterpart of `render_depth_and_mask`: one render call for all
+    `frames`; File Output nodes write frame_<k:0{digits}d>.exr/.png directly.
+    With `rgb_dir` (coincident cameras) the main output is the RGB sequence;
+    otherwise animation renders still save a main image per frame, so it goes
+    to a scratch file in the cheapest format and is deleted afterwards.
+    """
     scene = bpy.context.scene
     prev_camera = scene.camera
     prev_use_nodes = scene.use_nodes
     prev_filepath = scene.render.filepath
-    tmp_path = os.path.join(os.path.dirname(mask_png_path), '__tmp_mask_main.png')
-
+    prev_view_transform = scene.view_settings.view_transform
+    prev_sampling = None if rgb_dir else _set_depth_sampling(scene, samples)
+    prev_range = _set_frame_range(scene, frames)
+    prev_format = None if rgb_dir else _set_scratch_image_format(scene)
+    main_dir = rgb_dir or depth_dir
+    stem = frame_pattern(digits=digits)
+    main_stem = stem if rgb_dir else frame_pattern('__tmp_depth_main_', digits)
+    n_exr, n_mask = out_nodes
     try:
         scene.camera = cam_obj
-        scene.render.filepath = tmp_path
-        setup_mask_compositor(mask_png_path, object_index=object_index)
-        bpy.ops.render.render(write_still=True)
-        finalize_file_output(mask_png_path)
+        scene.render.filepath = os.path.join(main_dir, main_stem)
+        if not rgb_dir:
+            scene.view_settings.view_transform = 'Standard'
+        scene.use_nodes = True
+        n_exr.base_path = depth_dir
+        n_exr.file_slots[0].path = stem
+        n_mask.base_path = mask_dir
+        n_mask.file_slots[0].path = stem
+        bpy.ops.render.render(animation=True)
     finally:
-        try:
-            if os.path.exists(tmp_path):
-                os.remove(tmp_path)
-        except Exception as e:
-            print(f'[WARN] failed to remove tmp main render: {e}')
+        if not rgb_dir:
+            for k in frames:
+                tmp_path = os.path.join(
+                    depth_dir, f'__tmp_depth_main_{k:0{digits}d}.png'
+                )
+                try:
+                    os.remove(tmp_path)
+                except FileNotFoundError:
+                    pass
+                except Exception as e:
+                    print(f'[WARN] failed to remove tmp: {e}')
         scene.camera = prev_camera
         scene.use_nodes = prev_use_nodes
         scene.render.filepath = prev_filepath
+        scene.view_settings.view_transform = prev_view_transform
+        _restore_depth_sampling(scene, prev_sampling)
+        _restore_frame_range(scene, prev_range)
+        if prev_format is not None:
+            _restore_image_format(scene, prev_format)
 
 
-def finalize_file_output(target_path: str) -> bool:
-    """Rename compositor's <name>_0001.ext to target_path (overwrites if exists)."""
-    import shutil
-
-    base_dir = os.path.dirname(target_path)
-    base_name = os.path.splitext(os.path.basename(target_path))[0]
-    ext = os.path.splitext(target_path)[1]
-    src = os.path.join(base_dir, base_name + '_0001' + ext)
-    if os.path.exists(src):
-        if os.path.exists(target_path):
-            os.remove(target_path)
-        shutil.move(src, target_path)
-        return True
-    return False
+def finalize_file_output(target_path: str, frame: int | None = None) -> bool:
+    """Rename compositor's <name>_<frame>.ext to target_path (overwrites if exists).
+    The produced name is computed from the scene frame (File Output nodes always
+    append it), so this is a single same-directory rename: no stat calls, no copy.
+    """
+    if frame is None:
+        frame = bpy.context.scene.frame_current
+    root, ext = os.path.splitext(target_path)
+    src = f'{root}_{frame:04d}{ext}'
+    try:
+        os.replace(src, target_path)
+    except FileNotFoundError:
+        return False
+    return True
 
 
 def render_rgb(out_path: str, cam_obj):
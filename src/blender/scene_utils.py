@@ -1,27 +1,131 @@
 import math
+from contextlib import contextmanager
 
 # --- Third-party (Blender) ---
 import bpy
 from mathutils import Matrix, Vector
 
 # --- Local project modules ---
+from src.blender.material_utils import clear_material_cache, make_material
+from src.blender.mesh_utils import make_mesh, primitive_geometry
 from src.config.config_types import CameraIntrinsics
 
+# Evaluated depsgraph + evaluated world matrices, reused until transforms change.
+# Keyed by `obj.as_pointer()` (bpy structs are not weak-referenceable).
+_DG_CACHE = {'dg': None, 'frame': -1}
+_MW_CACHE: dict[int, Matrix] = {}
+
+
+def invalidate_dg():
+    """Drop the cached depsgraph/matrices; call after mutating transforms."""
+    _DG_CACHE['dg'] = None
+    _DG_CACHE['frame'] = -1
+    _MW_CACHE.clear()
+
+
+def _evaluated_depsgraph():
+    frame = bpy.context.scene.frame_current
+    if _DG_CACHE['dg'] is None or _DG_CACHE['frame'] != frame:
+        _MW_CACHE.clear()
+        _DG_CACHE['dg'] = bpy.context.evaluated_depsgraph_get()
+        _DG_CACHE['frame'] = frame
+    return _DG_CACHE['dg']
+
+
+# Nesting depth of `deferred_depsgraph()` blocks
+_DEFER = {'depth': 0}
+
+
+@contextmanager
+def deferred_depsgraph():
+    """Batch scene mutations: a single `view_layer.update()` is issued when the
+    outermost block exits (no per-object updates while building).
+    """
+    _DEFER['depth'] += 1
+    try:
+        yield
+    finally:
+        _DEFER['depth'] -= 1
+        if _DEFER['depth'] == 0:
+            bpy.context.view_layer.update()
+            invalidate_dg()
+
 
 def clear_scene():
     """Reset Blender to an empty scene."""
     bpy.ops.wm.read_factory_settings(use_empty=True)
+    invalidate_dg()
+    clear_material_cache()  # factory reset drops all datablocks
+
+
+def configure_batch_session():
+    """Disable undo snapshots (and UI work when headless) for scripted builds.
+    Call after `clear_scene()`: the factory reset restores default preferences.
+    """
+    bpy.context.preferences.edit.use_global_undo = False
+    if bpy.app.background:
+        bpy.context.preferences.view.show_splash = False
+        # render threads must not wait on (non-existent) UI redraws
+        bpy.context.scene.render.use_lock_interface = True
 
 
 def world_matrix_evaluated(obj) -> Matrix:
-    """Return evaluated world matrix after depsgraph applies modifiers."""
-    dg = bpy.context.evaluated_depsgraph_get()
-    return obj.evaluated_get(dg).matrix_world.copy()
+    """Return evaluated world matrix after depsgraph applies modifiers.
+    The depsgraph and the per-object result are cached until `invalidate_dg()`
+    (called by `set_obj_pose`) or a frame change.
+    Only needed for objects whose pose may come from constraints/drivers/parents
+    (e.g. the CAD object); plain posed objects can read `obj.matrix_world`.
+    """
+    key = obj.as_pointer()
+    M = _MW_CACHE.get(key)
+    if M is None:
+        dg = _evaluated_depsgraph()
+        M = obj.evaluated_get(dg).matrix_world.copy()
+        _MW_CACHE[key] = M
+    return M.copy()
 
 
 def set_obj_pose(obj, T_world: Matrix):
     """Assign a 4x4 world transform to an object."""
-    obj.matrix_world = T_world
+    if obj.parent is None:
+        obj.matrix_basis = T_world  # basis == world; no parent-inverse step
+    else:
+        obj.matrix_world = T_world
+    invalidate_dg()
+
+
+def bake_frame_poses(frame_poses: dict) -> None:
+    """Bake poses into CONSTANT keyframes so an animation render needs no Python.
+    frame_poses: {frame: [(obj, T_world), ...]}; objects must be unparented.
+    F-curves are filled in bulk (`foreach_set`), not one keyframe_insert per key.
+    """
+    per_obj: dict[int, tuple] = {}
+    for frame, poses in sorted(frame_poses.items()):
+        for obj, T_world in poses:
+            per_obj.setdefault(obj.as_pointer(), (obj, []))[1].append((frame, T_world))
+
+    for obj, keys in per_obj.values():
+        assert obj.parent is None
+        obj.rotation_mode = 'QUATERNION'
+        action = bpy.data.actions.new(f'{obj.name}Poses')
+        obj.animation_data_create().action = action
+        frames = [float(f) for f, _ in keys]
+        channels = (
+            ('location', [tuple(T.to_translation()) for _, T in keys]),
+            ('rotation_quaternion', [tuple(T.to_quaternion()) for _, T in keys]),
+        )
+        for data_path, values in channels:
+            for i in range(len(values[0])):
+                fc = action.fcurves.new(data_path, index=i)
+                points = fc.keyframe_points
+                points.add(len(keys))
+                points.foreach_set(
+                    'co', [c for f, v in zip(frames, values) for c in (f, v[i])]
+                )
+                for kp in points:
+                    kp.interpolation = 'CONSTANT'
+                fc.update()
+    invalidate_dg()
 
 
 def create_camera_from_intrinsics(name: str, intrinsics: CameraIntrinsics):
@@ -39,68 +143,39 @@ def create_camera_from_intrinsics(name: str, intrinsics: CameraIntrinsics):
 def create_room(size=(6.0, 6.0, 3.0)):
     """Create a box-like room: floor, ceiling, and 4 colored walls. All normals inward."""
     xlen, ylen, zlen = size
-
-    def make_material(name, rgba):
-        m = bpy.data.materials.new(name=name)
-        m.use_nodes = True
-        bsdf = m.node_tree.nodes.get('Principled BSDF')
-        bsdf.inputs['Base Color'].default_value = rgba
-        bsdf.inputs['Roughness'].default_value = 0.8
-        return m
-
-    m_floor = make_material('MatFloor', (0.7, 0.7, 0.7, 1.0))  # light gray
-    m_ceiling = make_material('MatCeil', (0.92, 0.92, 0.96, 1.0))  # lighter gray
-    m_xp = make_material('MatXpos', (0.9, 0.1, 0.1, 1.0))  # reddish
-    m_xn = make_material('MatXneg', (0.9, 0.1, 0.9, 1.0))  # purple
-    m_yp = make_material('MatYpos', (0.1, 0.90, 0.1, 1.0))  # green
-    m_yn = make_material('MatYneg', (0.95, 0.95, 0.10, 1.0))  # yellow
-
-    # Floor (Z=0)
-    bpy.ops.mesh.primitive_plane_add(size=1.0, location=(0.0, 0.0, 0.0))
-    floor = bpy.context.active_object
-    floor.scale = (xlen, ylen, 0.0)  # set final dimensions in meters
-    floor.name = 'RoomFloor'
-    floor.data.materials.append(m_floor)
-
-    # Ceiling
-    bpy.ops.mesh.primitive_plane_add(size=1.0, location=(0.0, 0.0, zlen))
-    ceil = bpy.context.active_object
-    ceil.scale = (xlen, ylen, 1.0)
-    ceil.rotation_euler = (math.pi, 0.0, 0.0)
-    ceil.name = 'RoomCeiling'
-    ceil.data.materials.append(m_ceiling)
-
-    # +X wall
-    bpy.ops.mesh.primitive_plane_add(size=1.0, location=(xlen / 2.0, 0.0, zlen / 2.0))
-    xp = bpy.context.active_object
-    xp.scale = (zlen, ylen, 1.0)
-    xp.rotation_euler = (0.0, -math.pi / 2.0, 0.0)
-    xp.name = 'RoomWallXpos'
-    xp.data.materials.append(m_xp)
-
-    # -X wall
-    bpy.ops.mesh.primitive_plane_add(size=1.0, location=(-xlen / 2.0, 0.0, zlen / 2.0))
-    xn = bpy.context.active_object
-    xn.scale = (zlen, ylen, 1.0)
-    xn.rotation_euler = (0.0, math.pi / 2.0, 0.0)
-    xn.name = 'RoomWallXneg'
-    xn.data.materials.append(m_xn)
-
-    # +Y wall
-    bpy.ops.mesh.primitive_plane_add(size=1.0, location=(0.0, ylen / 2.0, zlen / 2.0))
-    yp = bpy.context.active_object
-    yp.scale = (xlen, zlen, 1.0)
-    yp.rotation_euler = (math.pi / 2.0, 0.0, 0.0)
-    yp.name = 'RoomWallYpos'
-    yp.data.materials.append(m_yp)
-
-    # -Y wall
-    bpy.ops.mesh.primitive_plane_add(size=1.0, location=(0.0, -ylen / 2.0, zlen / 2.0))
-    yn = bpy.context.active_object
-    yn.scale = (xlen, zlen, 1.0)
-    yn.rotation_euler = (-math.pi / 2.0, 0.0, 0.0)
-    yn.name = 'RoomWallYneg'
-    yn.data.materials.append(m_yn)
+    hx, hy, hz = xlen / 2.0, ylen / 2.0, zlen / 2.0
+    half_pi = math.pi / 2.0
+
+    # name, material (name, rgba), location, scale, rotation
+    panels = (
+        ('RoomFloor', ('MatFloor', (0.7, 0.7, 0.7, 1.0)),  # light gray
+         (0.0, 0.0, 0.0), (xlen, ylen, 0.0), (0.0, 0.0, 0.0)),
+        ('RoomCeiling', ('MatCeil', (0.92, 0.92, 0.96, 1.0)),  # lighter gray
+         (0.0, 0.0, zlen), (xlen, ylen, 1.0), (math.pi, 0.0, 0.0)),
+        ('RoomWallXpos', ('MatXpos', (0.9, 0.1, 0.1, 1.0)),  # reddish
+         (hx, 0.0, hz), (zlen, ylen, 1.0), (0.0, -half_pi, 0.0)),
+        ('RoomWallXneg', ('MatXneg', (0.9, 0.1, 0.9, 1.0)),  # purple
+         (-hx, 0.0, hz), (zlen, ylen, 1.0), (0.0, half_pi, 0.0)),
+        ('RoomWallYpos', ('MatYpos', (0.1, 0.90, 0.1, 1.0)),  # green
+         (0.0, hy, hz), (xlen, zlen, 1.0), (half_pi, 0.0, 0.0)),
+        ('RoomWallYneg', ('MatYneg', (0.95, 0.95, 0.10, 1.0)),  # yellow
+         (0.0, -hy, hz), (xlen, zlen, 1.0), (-half_pi, 0.0, 0.0)),
+    )  # fmt: skip
+
+    # One unit-plane mesh shared by all six panels; the color lives in an
+    # object-linked material slot, so the panels need no mesh copies
+    plane = make_mesh('RoomPlane', *primitive_geometry('plane'))
+    plane.materials.append(None)
+    objects = bpy.context.collection.objects
+    for name, (mat_name, rgba), location, scale, rotation in panels:
+        obj = bpy.data.objects.new(name, plane)
+        objects.link(obj)
+        obj.location = location
+        obj.scale = scale
+        obj.rotation_euler = rotation
+        slot = obj.material_slots[0]
+        slot.link = 'OBJECT'
+        slot.material = make_material(mat_name, rgba, 0.8)
 
 
 def create_key_light(location=(3.0, -3.0, 5.0), power=1000.0):
@@ -16,67 +16,214 @@ import os
 import shlex
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
 from pathlib import Path
 
 # --- Third-party (Blender) ---
 import bpy
-from mathutils import Vector
 
 # --- Local project modules ---
 from src.blender.object_utils import create_object_from_spec
 from src.blender.render_ops import (
-    render_depth_exr,
-    render_obj_mask,
+    build_depth_mask_compositor,
+    render_depth_and_mask,
+    render_depth_and_mask_animation,
     render_rgb,
+    render_rgb_animation,
     set_render_settings,
 )
 from src.blender.scene_utils import (
+    bake_frame_poses,
     clear_scene,
+    configure_batch_session,
     create_camera_from_intrinsics,
     create_key_light,
     create_room,
+    deferred_depsgraph,
     set_obj_pose,
     world_matrix_evaluated,
 )
 from src.config.config_parser import load_config  # must return SceneCfg
-from src.config.config_types import Config
-from src.utils.io_utils import ensure_dirs, write_matrix_txt
-from src.utils.math_utils import look_at_quaternion, make_se3_matrix
+from src.config.config_types import CameraRig, Config
+from src.utils.io_utils import (
+    OUTPUT_SUBDIRS,
+    ensure_dirs,
+    frame_stem_digits,
+    shard_manifest_name,
+    shard_poses_name,
+    write_matrix_txt,
+    write_poses_npz,
+)
+from src.utils.math_utils import invert_se3, look_at_rig_matrices, make_se3_matrix
+from src.utils.render_cache import RenderCache
 from src.utils.summary import RenderSummary
 
-
-def _parse_args_from_blender(argv: list[str]) -> argparse.Namespace:
-    # Only parse args after the first "--"
-    if '--' in argv:
-        argv = argv[argv.index('--') + 1 :]
-    else:
-        argv = []  # allow nice error if user forgot to pass args
-    ap = argparse.ArgumentParser()
-    ap.add_argument('--config', required=True, help='Path to scene .toml')
-    return ap.parse_args(argv)
-
-
-_ARGS = _parse_args_from_blender(sys.argv)
-config_path = os.path.abspath(_ARGS.config)
-
-PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+# manifest.csv columns; per-frame rows are tuples in this order
+MANIFEST_FIELDS = (
+    'frame',
+    'rgb',
+    'depth_exr_gt',
+    'depth_exr_noisy',
+    'depth_viz_gt',
+    'depth_viz_noisy',
+    'mask',
+    'T_WC_txt',
+    'T_WD_txt',
+    'T_WO_txt',
+    'p_WC',
+    'p_W_target',
+    'zmax',
+)
 
 
 # -----------------------------------------------------------------------------
 # CLI args
 # -----------------------------------------------------------------------------
-def parse_args(project_root: Path) -> Path:
-    """Parse --config after Blender's '--' separator; return absolute Path."""
+def parse_args(project_root: Path) -> argparse.Namespace:
+    """Parse script args after Blender's '--' separator (config path is resolved)."""
     # Blender passes script args after '--'. Extract them safely.
     argv = sys.argv[sys.argv.index('--') + 1 :] if '--' in sys.argv else []
-    parser = argparse.ArgumentParser(description='RGB-D sequence renderer')
+    # Single parser for all script args: unknown flags are an error, not ignored
+    parser = argparse.ArgumentParser(
+        prog='blender_rgbd_render_seq', description='RGB-D sequence renderer'
+    )
     parser.add_argument(
         '--config',
         default=str(project_root / 'config' / 'scene_example.toml'),
         help='Path to scene config TOML file',
     )
+    parser.add_argument(
+        '--engine',
+        choices=('cycles', 'eevee'),
+        default='cycles',
+        help='Render engine (eevee: ~10x faster raster RGB for quick previews; '
+        'no object-index pass, so masks need cycles)',
+    )
+    parser.add_argument(
+        '--samples',
+        type=int,
+        default=None,
+        help='Override Cycles samples of the quality preset (RGB render)',
+    )
+    parser.add_argument(
+        '--depth-samples',
+        type=int,
+        default=1,
+        help='Cycles samples for depth/mask renders (1: no edge blending; raise '
+        'for anti-aliased depth edges)',
+    )
+    parser.add_argument(
+        '--depth-precision',
+        choices=('auto', '16', '32'),
+        default='auto',
+        help='Depth EXR float precision (16 = half: half the size; '
+        'auto = 16 only if zmax keeps half-float steps sub-millimetre)',
+    )
+    parser.add_argument(
+        '--exr-codec',
+        choices=('auto', 'ZIP', 'ZIPS', 'NONE', 'DWAA', 'PIZ'),
+        default='auto',
+        help='Depth EXR codec (ZIPS: lossless, per-scanline blocks decode in '
+        'parallel; ZIP: 16-line blocks, slightly smaller; avoid PIZ; '
+        'auto = NONE if the noise postprocess re-encodes the GT EXR, else ZIPS)',
+    )
+    parser.add_argument(
+        '--shard-id',
+        type=int,
+        default=0,
+        help='Render only frames k with k %% num_shards == shard_id',
+    )
+    parser.add_argument(
+        '--num-shards',
+        type=int,
+        default=1,
+        help='Number of parallel render processes (see src/render_parallel.py)',
+    )
+    parser.add_argument(
+        '--gpu-devices',
+        type=lambda v: [int(x) for x in v.split(',') if x.strip()],
+        default=None,
+        help='Comma-separated GPU indices to render on (default: all visible)',
+    )
+    parser.add_argument(
+        '--animation',
+        action='store_true',
+        help='Render the sequence as one Blender animation per camera '
+        '(amortizes per-render setup) instead of a Python per-frame loop',
+    )
+    parser.add_argument(
+        '--no-persistent-data',
+        dest='persistent_data',
+        action='store_false',
+        help='Do not keep Cycles scene data (BVH, textures) resident between frames',
+    )
+    parser.add_argument(
+        '--no-render-cache',
+        dest='render_cache',
+        action='store_false',
+        help='Re-render every frame even if up-to-date outputs exist',
+    )
+    parser.add_argument(
+        '--no-pose-txt',
+        dest='pose_txt',
+        action='store_false',
+        help='Skip the per-frame T_WC/T_WD text files (poses/poses.npz holds '
+        'every pose either way)',
+    )
+    parser.add_argument(
+        '--verbose',
+        action='store_true',
+        help='Print a progress line per frame (off: setup and summary only)',
+    )
     args = parser.parse_args(argv)
-    return Path(args.config).resolve()
+    if args.num_shards < 1 or not 0 <= args.shard_id < args.num_shards:
+        parser.error('--shard-id must be in [0, --num-shards)')
+    args.config = Path(args.config).resolve()
+    return args
+
+
+# Half floats have 10 mantissa bits: the step is 2^-10 m (~0.98 mm) below 2 m
+# and doubles with every power of two beyond, so 'auto' only picks 16-bit there
+HALF_SUBMM_ZMAX_M = 2.0
+
+
+def _resolve_depth_precision(choice: str, zmax_m: float) -> str:
+    """Map --depth-precision to an EXR color depth ('16' or '32')."""
+    if choice != 'auto':
+        return choice
+    return '16' if 0.0 < zmax_m <= HALF_SUBMM_ZMAX_M else '32'
+
+
+def _resolve_exr_codec(choice: str, cfg: Config) -> str:
+    """Map --exr-codec to a compositor EXR codec.
+    With noise on and zmax > 0, cli_depth_noise_batch rewrites every GT EXR
+    (clamped, ZIPS) off the render loop, so Blender can skip compressing it.
+    """
+    if choice != 'auto':
+        return choice
+    rewritten = cfg.noise.enabled and float(cfg.render.zmax_m or 0.0) > 0.0
+    return 'NONE' if rewritten else 'ZIPS'
+
+
+def _write_manifest_row(man_writer, man_file, row: tuple) -> None:
+    man_writer.writerow(row)
+    man_file.flush()
+
+
+def _quiet(*_args, **_kwargs) -> None:
+    """Stand-in for `print` when per-frame progress lines are off."""
+
+
+def _cameras_coincide(rig: CameraRig) -> bool:
+    """True if the depth camera is the color camera (identity T_DC, same intrinsics)."""
+    p, q = rig.T_DC.p, rig.T_DC.q_wxyz
+    return (
+        all(abs(x) < 1e-12 for x in p)
+        and abs(abs(q[0]) - 1.0) < 1e-12
+        and all(abs(x) < 1e-12 for x in q[1:])
+        and rig.color_intrinsics == rig.depth_intrinsics
+    )
 
 
 # -----------------------------------------------------------------------------
@@ -90,13 +237,13 @@ def main():
     script_dir = Path(__file__).resolve().parent
     project_root = (script_dir / '..').resolve()
 
-    cfg_path = parse_args(project_root)
+    args = parse_args(project_root)
+    cfg_path = args.config
     cfg: Config = load_config(str(cfg_path), use_toml=True)
 
     # Prepare output directories and manifest
     scene_root = ensure_dirs(cfg.render.out_dir, cfg.render.scene_id)
-    manifest_path = scene_root / 'manifest.csv'
-    man_rows = []
+    manifest_path = scene_root / shard_manifest_name(args.shard_id, args.num_shards)
 
     # --- Summary container
     summary = RenderSummary(
@@ -104,117 +251,300 @@ def main():
         scene_root=scene_root,
     )
 
-    # Build scene
+    # Build scene (one depsgraph update at the end of the block)
     clear_scene()
-    create_key_light(location=(2.5, -2.5, 2.5), power=400.0)
-    create_key_light(location=(-2.5, 2.5, 2.5), power=400.0)
-    create_room(size=(6.0, 6.0, 3.0))
-
-    # Object
-    obj = create_object_from_spec(cfg.obj, object_index=1)
-
-    # Cameras
-    cam_color = create_camera_from_intrinsics(
-        name='ColorCamera',
-        intrinsics=cfg.rig.color_intrinsics,
-    )
-    cam_depth = create_camera_from_intrinsics(
-        name='ColorCamera',
-        intrinsics=cfg.rig.depth_intrinsics,
-    )
+    configure_batch_session()
+    with deferred_depsgraph():
+        create_key_light(location=(2.5, -2.5, 2.5), power=400.0)
+        create_key_light(location=(-2.5, 2.5, 2.5), power=400.0)
+        create_room(size=(6.0, 6.0, 3.0))
+
+        # Object
+        obj = create_object_from_spec(cfg.obj, object_index=1)
+
+        # Cameras
+        cam_color = create_camera_from_intrinsics(
+            name='ColorCamera',
+            intrinsics=cfg.rig.color_intrinsics,
+        )
+        # Coincident color/depth cameras: one camera serves both renders
+        single_pass = _cameras_coincide(cfg.rig)
+        cam_depth = (
+            cam_color
+            if single_pass
+            else create_camera_from_intrinsics(
+                name='DepthCamera',
+                intrinsics=cfg.rig.depth_intrinsics,
+            )
+        )
 
-    # Depth rig relation (depth -> color)
-    T_DC = make_se3_matrix(cfg.rig.T_DC.p, cfg.rig.T_DC.q_wxyz)
+    # Depth rig relation (depth -> color), inverted once: T_WD = T_WC @ T_CD.
+    # Rigid, so the inverse is a transpose (no general 4x4 inversion)
+    T_CD = invert_se3(make_se3_matrix(cfg.rig.T_DC.p, cfg.rig.T_DC.q_wxyz))
 
     # Common render settings
-    set_render_settings(
+    device_desc = set_render_settings(
         cfg.render.width,
         cfg.render.height,
-        engine='CYCLES',
+        engine='CYCLES' if args.engine == 'cycles' else 'BLENDER_EEVEE',
         quality='draft',
         device='GPU',
+        samples=args.samples,
+        device_indices=args.gpu_devices,
+        persistent_data=args.persistent_data,
+    )
+
+    # Coincident color/depth cameras: one render per frame yields RGB+depth+mask.
+    # Distinct color/depth poses need their own render: RGB from the color
+    # camera, depth + mask (one render, low samples) from the depth camera
+    print(
+        '[INFO] Renders/frame   : '
+        + ('1 (RGB + depth + mask)' if single_pass else '2 (RGB | depth + mask)')
     )
 
+    depth_precision = _resolve_depth_precision(
+        args.depth_precision, float(cfg.render.zmax_m or 0.0)
+    )
+    exr_codec = _resolve_exr_codec(args.exr_codec, cfg)
+    print(f'[INFO] Depth EXR       : {depth_precision}-bit float, {exr_codec}')
+
+    # Depth/mask compositor graph: built once, only output paths change per frame
+    depth_nodes = build_depth_mask_compositor(
+        object_index=1,
+        exr_depth=depth_precision,
+        exr_codec=exr_codec,
+    )
+    if single_pass:
+        # Every render is the combined pass: camera and compositor are set once
+        # here instead of being switched and restored around each frame
+        bpy.context.scene.camera = cam_depth
+        bpy.context.scene.use_nodes = True
+
     summary.engine_name = bpy.context.scene.render.engine
-    summary.device_name = getattr(bpy.context.scene.cycles, 'device', 'CPU')
-
-    # Iterate camera extrinsics (position + target), orientation computed automatically
-    for k, cam_ext in enumerate(cfg.seq.camera_extrinsics):
-        summary.start_frame_timer()
-
-        eye = Vector(cam_ext.p_WC)
-        target = Vector(cam_ext.p_W_target)
-
-        # Orientation: look-at so that local -Z faces the target
-        q = look_at_quaternion(eye, target)
-
-        # Set color camera pose
-        T_WC = make_se3_matrix(eye, (q.w, q.x, q.y, q.z))
-        set_obj_pose(cam_color, T_WC)
-        bpy.context.scene.camera = cam_color
-        bpy.context.view_layer.update()
-
-        T_WD = T_WC @ T_DC.inverted()
-        set_obj_pose(cam_depth, T_WD)
-        bpy.context.view_layer.update()
-
-        # Filenames
-        stem = f'frame_{k:04d}'
-        rgb_path = os.path.join(scene_root, 'rgb', f'{stem}.png')
-        d_exr_gt_path = os.path.join(scene_root, 'depth_exr_gt', f'{stem}.exr')
-        d_exr_noisy_path = os.path.join(scene_root, 'depth_exr_noisy', f'{stem}.exr')
-        d_viz_gt_path = os.path.join(scene_root, 'depth_viz_gt', f'{stem}.png')
-        d_viz_noisy_path = os.path.join(scene_root, 'depth_viz_noisy', f'{stem}.png')
-        mask_path = os.path.join(scene_root, 'mask', f'{stem}.png')
-
-        # Save poses
-        T_WC_eval = world_matrix_evaluated(cam_color)
-        T_WD_eval = world_matrix_evaluated(cam_depth)
-        write_matrix_txt(
-            os.path.join(scene_root, 'poses', f'T_WC_{stem}.txt'), T_WC_eval
-        )
-        write_matrix_txt(
-            os.path.join(scene_root, 'poses', f'T_WD_{stem}.txt'), T_WD_eval
-        )
-        write_matrix_txt(
-            os.path.join(scene_root, 'poses', f'T_WO_{stem}.txt'),
-            world_matrix_evaluated(obj),
+    summary.device_name = device_desc
+
+    # Output dirs exist (ensure_dirs) and are fixed: resolve them once
+    out_dirs = {name: os.path.join(scene_root, name) for name in OUTPUT_SUBDIRS}
+    # '<dir>/' prefixes: per-frame paths are plain string concatenation
+    rgb_pre, depth_pre, mask_pre, poses_pre = (
+        out_dirs[name] + os.sep for name in ('rgb', 'depth_exr_gt', 'mask', 'poses')
+    )
+
+    # Frame render cache (per-frame loop only); the key covers everything that
+    # changes the rendered pixels besides the camera poses
+    render_cache = (
+        RenderCache(scene_root, args.shard_id, args.num_shards)
+        if args.render_cache and not args.animation
+        else None
+    )
+    scene_sig = repr(
+        (
+            cfg.render,
+            cfg.rig,
+            cfg.obj,
+            args.engine,
+            args.samples,
+            args.depth_samples,
+            depth_precision,
+            exr_codec,
         )
+    )
+
+    # --animation: {frame: [(camera, T_world), ...]} baked into keyframes
+    frame_poses = {}
+    zmax_str = f'{cfg.render.zmax_m}'
+    digits = frame_stem_digits(len(cfg.seq.camera_extrinsics))
+
+    # The object never moves: one pose file, shared by every manifest row
+    T_WO_rel = 'poses/T_WO.txt'
+    T_WO = world_matrix_evaluated(obj)
+    write_matrix_txt(f'{poses_pre}T_WO.txt', T_WO)
+
+    # Color and depth camera poses for the whole sequence, computed in one batch
+    T_WC_seq, T_WD_seq = look_at_rig_matrices(
+        [e.p_WC for e in cfg.seq.camera_extrinsics],
+        [e.p_W_target for e in cfg.seq.camera_extrinsics],
+        T_CD,
+    )
 
-        # Render
-        print(f'[INFO] Rendering RGB: {rgb_path}')
-        render_rgb(rgb_path, cam_color)
-        print(f'[INFO] Rendering GT Depth EXR only: {d_exr_gt_path}')
-        render_depth_exr(d_exr_gt_path, cam_depth)
-        print(f'[INFO] Rendering Mask: {mask_path}')
-        render_obj_mask(mask_path, cam_depth, object_index=1)
-
-        # Manifest row
-        man_rows.append(
-            {
-                'frame': k,
-                'rgb': os.path.relpath(rgb_path, scene_root),
-                'depth_exr_gt': os.path.relpath(d_exr_gt_path, scene_root),
-                'depth_exr_noisy': os.path.relpath(d_exr_noisy_path, scene_root),
-                'depth_viz_gt': os.path.relpath(d_viz_gt_path, scene_root),
-                'depth_viz_noisy': os.path.relpath(d_viz_noisy_path, scene_root),
-                'mask': os.path.relpath(mask_path, scene_root),
-                'T_WC_txt': f'poses/T_WC_{stem}.txt',
-                'T_WD_txt': f'poses/T_WD_{stem}.txt',
-                'T_WO_txt': f'poses/T_WO_{stem}.txt',
-                'p_WC': f'{cam_ext.p_WC}',
-                'p_W_target': f'{cam_ext.p_W_target}',
-                'zmax': f'{cfg.render.zmax_m}',
-            }
+    # Per-frame progress lines (thousands of unbuffered writes on long runs)
+    log = print if args.verbose else _quiet
+
+    # Closed in reverse on exit, also when a frame raises: the render cache log,
+    # then the I/O thread (drains queued pose/manifest writes), then the manifest
+    with ExitStack() as stack:
+        # Written as frames finish (flushed per row): a crash leaves a valid
+        # manifest of the completed frames. --animation rows wait for the render.
+        man_file = stack.enter_context(open(manifest_path, 'w', newline=''))
+        man_writer = csv.writer(man_file)
+        man_writer.writerow(MANIFEST_FIELDS)
+        man_rows = []
+
+        # Pose files and manifest rows are written by one background thread (FIFO,
+        # so rows keep frame order) while the main thread renders; `pending` holds
+        # the previous frame's writes, awaited next frame so errors still surface
+        io_pool = stack.enter_context(ThreadPoolExecutor(max_workers=1))
+        if render_cache:
+            stack.enter_context(render_cache)
+        pending = []
+        done_frames = []  # this shard's frames, in order (for poses.npz)
+        prev_T_WC = None
+
+        # Iterate camera extrinsics (position + target), orientation computed automatically
+        for k, cam_ext in enumerate(cfg.seq.camera_extrinsics):
+            if k % args.num_shards != args.shard_id:
+                continue  # frame belongs to another shard/process
+            summary.start_frame_timer()
+            for fut in pending:
+                fut.result()
+            pending.clear()
+
+            # Set color camera pose (look-at: local -Z faces the target)
+            T_WC = T_WC_seq[k]
+            T_WD = T_WD_seq[k]  # T_WC @ T_CD
+            # Repeated pose (static or duplicate frames): the cameras are already
+            # there, so skip the matrix writes and the depsgraph tag they fire
+            if prev_T_WC is None or T_WC != prev_T_WC:
+                set_obj_pose(cam_color, T_WC)
+                if not single_pass:
+                    set_obj_pose(cam_depth, T_WD)
+                prev_T_WC = T_WC
+            # No explicit view layer update: the render evaluates the depsgraph itself
+
+            # Filenames
+            stem = f'frame_{k:0{digits}d}'
+            rgb_path = f'{rgb_pre}{stem}.png'
+            d_exr_gt_path = f'{depth_pre}{stem}.exr'
+            mask_path = f'{mask_pre}{stem}.png'
+
+            # Save poses
+            # Unparented cameras without constraints/drivers: the evaluated world
+            # pose is exactly the matrix just assigned
+            done_frames.append(k)
+            if args.pose_txt:
+                pending.append(
+                    io_pool.submit(
+                        write_matrix_txt, f'{poses_pre}T_WC_{stem}.txt', T_WC
+                    )
+                )
+                pending.append(
+                    io_pool.submit(
+                        write_matrix_txt, f'{poses_pre}T_WD_{stem}.txt', T_WD
+                    )
+                )
+
+            # Memoization: skip frames already rendered with identical poses/scene,
+            # reuse outputs of an identical earlier frame
+            outputs = [rgb_path, d_exr_gt_path, mask_path]
+            key = RenderCache.frame_key((T_WC, T_WD), scene_sig)
+            src_outputs = render_cache.find_source(key) if render_cache else None
+
+            # Render (per frame), unless the whole sequence is one animation render
+            if args.animation:
+                frame_poses[k] = [(cam_color, T_WC)]
+                if not single_pass:
+                    frame_poses[k].append((cam_depth, T_WD))
+            elif render_cache and render_cache.is_fresh(stem, key, outputs):
+                log(f'[INFO] Up to date, skipping render: {stem}')
+            elif src_outputs is not None:
+                log(f'[INFO] Same pose as a rendered frame, copying: {stem}')
+                RenderCache.copy_outputs(src_outputs, outputs)
+            elif single_pass:
+                log(f'[INFO] Rendering RGB + GT Depth EXR + Mask: {rgb_path}')
+                render_depth_and_mask(
+                    d_exr_gt_path, mask_path, cam_depth, depth_nodes, rgb_path=rgb_path
+                )
+            else:
+                log(f'[INFO] Rendering RGB: {rgb_path}')
+                render_rgb(rgb_path, cam_color)
+                log(
+                    f'[INFO] Rendering GT Depth EXR + Mask: {d_exr_gt_path}, {mask_path}'
+                )
+                render_depth_and_mask(
+                    d_exr_gt_path,
+                    mask_path,
+                    cam_depth,
+                    depth_nodes,
+                    samples=args.depth_samples,
+                )
+            if render_cache:
+                render_cache.record(stem, key, outputs)
+
+            # Manifest row (paths relative to scene_root, in MANIFEST_FIELDS order)
+            row = (
+                k,
+                f'rgb/{stem}.png',
+                f'depth_exr_gt/{stem}.exr',
+                f'depth_exr_noisy/{stem}.exr',
+                f'depth_viz_gt/{stem}.png',
+                f'depth_viz_noisy/{stem}.png',
+                f'mask/{stem}.png',
+                f'poses/T_WC_{stem}.txt' if args.pose_txt else '',
+                f'poses/T_WD_{stem}.txt' if args.pose_txt else '',
+                T_WO_rel,
+                f'{cam_ext.p_WC}',
+                f'{cam_ext.p_W_target}',
+                zmax_str,
+            )
+            if args.animation:
+                man_rows.append(row)
+            else:
+                pending.append(
+                    io_pool.submit(_write_manifest_row, man_writer, man_file, row)
+                )
+            summary.add_frame_num(1)
+            summary.stop_frame_timer()
+
+        io_pool.shutdown(wait=True)
+        for fut in pending:
+            fut.result()
+        # Whole-sequence poses: one binary write instead of parsing 2N text files
+        write_poses_npz(
+            poses_pre + shard_poses_name(args.shard_id, args.num_shards),
+            done_frames,
+            [T_WC_seq[k] for k in done_frames],
+            [T_WD_seq[k] for k in done_frames],
+            T_WO,
         )
-        summary.add_frame_num(1)
-        summary.stop_frame_timer()
 
-    # Write manifest CSV
-    with open(manifest_path, 'w', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=list(man_rows[0].keys()))
-        writer.writeheader()
-        writer.writerows(man_rows)
+        if args.animation and frame_poses:
+            frames = range(
+                args.shard_id, len(cfg.seq.camera_extrinsics), args.num_shards
+            )
+            bake_frame_poses(frame_poses)
+            if single_pass:
+                print(
+                    f'[INFO] Animation render RGB + depth + mask: {len(frames)} frames'
+                )
+                render_depth_and_mask_animation(
+                    out_dirs['depth_exr_gt'],
+                    out_dirs['mask'],
+                    cam_depth,
+                    depth_nodes,
+                    frames,
+                    rgb_dir=out_dirs['rgb'],
+                    digits=digits,
+                )
+            else:
+                print(f'[INFO] Animation render RGB: {len(frames)} frames')
+                render_rgb_animation(out_dirs['rgb'], cam_color, frames, digits=digits)
+                print(f'[INFO] Animation render depth + mask: {len(frames)} frames')
+                render_depth_and_mask_animation(
+                    out_dirs['depth_exr_gt'],
+                    out_dirs['mask'],
+                    cam_depth,
+                    depth_nodes,
+                    frames,
+                    samples=args.depth_samples,
+                    digits=digits,
+                )
+
+        man_writer.writerows(man_rows)
+
+    if args.num_shards > 1:
+        # The parallel launcher merges shard manifests and runs the postprocess
+        print(f'[INFO] shard {args.shard_id}/{args.num_shards} done: {manifest_path}')
+        return
 
     # --- System Python postprocess ---
     # 1) Add noise & write noisy EXR + viz (noisy-based)
@@ -224,11 +554,11 @@ def main():
     # Normalize environment and working directory so that 'src' is always importable
     env = os.environ.copy()
     env['PYTHONPATH'] = (
-        PROJECT_ROOT
+        str(project_root)
         if 'PYTHONPATH' not in env or not env['PYTHONPATH']
-        else f'{PROJECT_ROOT}:{env["PYTHONPATH"]}'
+        else f'{project_root}{os.pathsep}{env["PYTHONPATH"]}'
     )
-    cwd = PROJECT_ROOT  # Execute from the project root
+    cwd = project_root  # Execute from the project root
     # Make child Python print() unbuffered so logs show up immediately
     env['PYTHONUNBUFFERED'] = '1'
 
@@ -237,7 +567,7 @@ def main():
         '-m',
         'src.improc.cli_depth_noise_batch',
         '--config',
-        str(config_path),
+        str(cfg_path),
     ]
     print(
         f'[INFO] Depth noise (system Python):\n  {" ".join(shlex.quote(c) for c in noise_cmd)}'
@@ -254,7 +584,7 @@ def main():
         '-m',
         'src.improc.cli_depth_viz_batch',
         '--config',
-        str(config_path),
+        str(cfg_path),
     ]
     print(
         f'[INFO] Depth viz (prefer noisy):\n  {" ".join(shlex.quote(c) for c in viz_cmd)}'
@@ -1,16 +1,8 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import Any, Dict, Iterable, Tuple
 
-# Try stdlib tomllib (Py>=3.11), otherwise fall back to 'tomli' backport.
-try:
-    import tomllib  # Python 3.11+
-except Exception:  # pragma: no cover
-    try:
-        import tomli as tomllib  # type: ignore
-    except Exception:
-        tomllib = None  # type: ignore
-
 from src.config.config_types import (
     SE3,
     CameraExtrinsics,
@@ -35,17 +27,19 @@ from src.config.config_types import (
 
 
 def _as_vec3(v: Iterable[float]) -> Tuple[float, float, float]:
-    x = tuple(float(x) for x in v)
-    if len(x) != 3:
-        raise ValueError(f'Vec3 must have length 3, got {len(x)}: {v}')
-    return x  # type: ignore[return-value]
+    try:
+        a, b, c = v
+    except (TypeError, ValueError):
+        raise ValueError(f'Vec3 must have length 3, got: {v}') from None
+    return (float(a), float(b), float(c))
 
 
 def _as_quat_wxyz(v: Iterable[float]) -> Tuple[float, float, float, float]:
-    x = tuple(float(x) for x in v)
-    if len(x) != 4:
-        raise ValueError(f'QuatWXYZ must have length 4, got {len(x)}: {v}')
-    return x  # type: ignore[return-value]
+    try:
+        w, x, y, z = v
+    except (TypeError, ValueError):
+        raise ValueError(f'QuatWXYZ must have length 4, got: {v}') from None
+    return (float(w), float(x), float(y), float(z))
 
 
 def _get(d, key, default):
@@ -56,39 +50,43 @@ def _get(d, key, default):
 # Default (hardcoded) config
 # -----------------------------
 
-DEFAULT_CONFIG = Config(
-    render=RenderConfig(
-        out_dir='./outputs',
-        scene_id='cube_demo',
-        width=640,
-        height=480,
-        zmax_m=10.0,
-    ),
-    rig=CameraRig(
-        color_intrinsics=CameraIntrinsics(
-            focal_length_mm=35.0, clip_start=0.01, clip_end=100.0
+
+@lru_cache(maxsize=None)
+def default_config() -> Config:
+    """Built on first use only (most runs load a TOML), then shared."""
+    return Config(
+        render=RenderConfig(
+            out_dir='./outputs',
+            scene_id='cube_demo',
+            width=640,
+            height=480,
+            zmax_m=10.0,
         ),
-        depth_intrinsics=CameraIntrinsics(
-            focal_length_mm=35.0, clip_start=0.01, clip_end=100.0
+        rig=CameraRig(
+            color_intrinsics=CameraIntrinsics(
+                focal_length_mm=35.0, clip_start=0.01, clip_end=100.0
+            ),
+            depth_intrinsics=CameraIntrinsics(
+                focal_length_mm=35.0, clip_start=0.01, clip_end=100.0
+            ),
+            T_DC=SE3(p=(-0.1, 0.0, 0.0), q_wxyz=(1.0, 0.0, 0.0, 0.0)),
         ),
-        T_DC=SE3(p=(-0.1, 0.0, 0.0), q_wxyz=(1.0, 0.0, 0.0, 0.0)),
-    ),
-    obj=ObjectPrimitive(
-        kind='primitive',
-        shape='cube',
-        size=(1.0, 1.0, 1.0),
-        color_rgba=(0.8, 0.2, 0.2, 1.0),
-        T_WO=SE3(p=(0.0, 0.0, 0.5), q_wxyz=(1.0, 0.0, 0.0, 0.0)),
-    ),
-    seq=SequenceConfig(
-        camera_extrinsics=[
-            CameraExtrinsics(p_WC=(1.5, -2.5, 1.4), p_W_target=(0.0, 0.0, 0.5)),
-            CameraExtrinsics(p_WC=(1.5, 2.5, 1.4), p_W_target=(0.0, 0.0, 0.5)),
-            CameraExtrinsics(p_WC=(-1.5, 2.5, 1.4), p_W_target=(0.0, 0.0, 0.5)),
-            CameraExtrinsics(p_WC=(-1.5, -2.5, 1.4), p_W_target=(0.0, 0.0, 0.5)),
-        ]
-    ),
-)
+        obj=ObjectPrimitive(
+            kind='primitive',
+            shape='cube',
+            size=(1.0, 1.0, 1.0),
+            color_rgba=(0.8, 0.2, 0.2, 1.0),
+            T_WO=SE3(p=(0.0, 0.0, 0.5), q_wxyz=(1.0, 0.0, 0.0, 0.0)),
+        ),
+        seq=SequenceConfig(
+            camera_extrinsics=[
+                CameraExtrinsics(p_WC=(1.5, -2.5, 1.4), p_W_target=(0.0, 0.0, 0.5)),
+                CameraExtrinsics(p_WC=(1.5, 2.5, 1.4), p_W_target=(0.0, 0.0, 0.5)),
+                CameraExtrinsics(p_WC=(-1.5, 2.5, 1.4), p_W_target=(0.0, 0.0, 0.5)),
+                CameraExtrinsics(p_WC=(-1.5, -2.5, 1.4), p_W_target=(0.0, 0.0, 0.5)),
+            ]
+        ),
+    )
 
 
 # -----------------------------
@@ -168,13 +166,25 @@ def _parse_seq(d: Dict[str, Any]) -> SequenceConfig:
     return SequenceConfig(camera_extrinsics=items)
 
 
+_DEPTH_VIZ_MODES = ('linear', 'disparity')
+
+
 def _parse_render(d: Dict[str, Any]) -> RenderConfig:
+    viz_mode = str(d.get('depth_viz_mode', 'linear')).strip().lower()
+    if viz_mode not in _DEPTH_VIZ_MODES:
+        raise ValueError(
+            f'[render.depth_viz_mode] unsupported: {viz_mode!r} '
+            f'(expected one of {_DEPTH_VIZ_MODES})'
+        )
     return RenderConfig(
         out_dir=str(d['out_dir']),
         scene_id=str(d['scene_id']),
         width=int(d['width']),
         height=int(d['height']),
         zmax_m=float(d['zmax_m']),
+        emit_depth_viz=bool(d.get('emit_depth_viz', True)),
+        depth_viz_mode=viz_mode,
+        depth_viz_znear_m=float(d.get('depth_viz_znear_m', 0.0)),
     )
 
 
@@ -207,6 +217,20 @@ def _parse_noise(d: Dict[str, Any]) -> NoiseConfig:
     )
 
 
+def _import_tomllib():
+    """stdlib tomllib (Py>=3.11), else the 'tomli' backport, else None.
+    Imported on first parse only: default-config loads never need a TOML parser.
+    """
+    try:
+        import tomllib  # Python 3.11+
+    except Exception:  # pragma: no cover
+        try:
+            import tomli as tomllib  # type: ignore
+        except Exception:
+            tomllib = None  # type: ignore
+    return tomllib
+
+
 def load_config(toml_path: str | None = None, *, use_toml: bool = True) -> Config:
     """Return a complete :class:`SceneCfg`.
 
@@ -215,10 +239,12 @@ def load_config(toml_path: str | None = None, *, use_toml: bool = True) -> Confi
     """
     if not use_toml:
         print('Using default hardcoded config')
-        return DEFAULT_CONFIG
+        return default_config()
 
     if toml_path is None:
         raise ValueError('toml_path is required when use_toml=True')
+
+    tomllib = _import_tomllib()
     if tomllib is None:
         raise RuntimeError(
             'TOML parser not available. Install backport via '
@@ -4,14 +4,18 @@ from typing import List, Literal, Tuple, Union
 Vec3 = Tuple[float, float, float]
 QuatWXYZ = Tuple[float, float, float, float]
 
+# repr/eq are generated only where they are used: the render cache signature
+# is the repr of render/rig/obj (and the types nested in them), and rig
+# intrinsics are compared by value. The other configs skip both.
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class SE3:
     p: Vec3
     q_wxyz: QuatWXYZ
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class RenderConfig:
     """Top-level render parameters."""
 
@@ -20,9 +24,14 @@ class RenderConfig:
     width: int
     height: int
     zmax_m: float
+    emit_depth_viz: bool = True  # write depth_viz_{gt,noisy} PNGs in postprocess
+    # 'linear': 8-bit preview (invalid pixels green); 'disparity': 16-bit 1/z
+    # code over [depth_viz_znear_m, zmax_m] (0: depth camera clip_start)
+    depth_viz_mode: str = 'linear'
+    depth_viz_znear_m: float = 0.0
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class CameraIntrinsics:
     """Minimal camera intrinsics used by Blender setup."""
 
@@ -31,7 +40,7 @@ class CameraIntrinsics:
     clip_end: float
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class CameraRig:
     """Color and (optional) depth camera intrinsics."""
 
@@ -40,7 +49,7 @@ class CameraRig:
     T_DC: SE3  # depth camera -> color camera transform
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ObjectConfig:
     """A simple parametric object placed in the scene."""
 
@@ -50,7 +59,7 @@ class ObjectConfig:
     T_WO: SE3  # world_T_object
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True, repr=False, eq=False)
 class CameraExtrinsics:
     """Per-frame camera pose inputs"""
 
@@ -58,37 +67,37 @@ class CameraExtrinsics:
     p_W_target: Vec3  # target point in world frame
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True, repr=False, eq=False)
 class SequenceConfig:
     camera_extrinsics: List[CameraExtrinsics]
 
 
-@dataclass
+@dataclass(slots=True, repr=False, eq=False)
 class GaussianNoiseConfig:
     enabled: bool = False
     sigma_m: float = 0.0  # stddev in meters
 
 
-@dataclass
+@dataclass(slots=True, repr=False, eq=False)
 class MultiplicativeNoiseConfig:
     enabled: bool = False
     sigma_rel: float = 0.0  # relative stddev (e.g. 0.01 = 1%)
 
 
-@dataclass
+@dataclass(slots=True, repr=False, eq=False)
 class QuantizationNoiseConfig:
     enabled: bool = False
     step_m: float = 0.0  # quantization step (e.g. bin width) in meters
 
 
-@dataclass
+@dataclass(slots=True, repr=False, eq=False)
 class DropoutNoiseConfig:
     enabled: bool = False
     p: float = 0.0  # probability of pixel dropout
     fill: float = 0.0  # substitute value for dropped pixels
 
 
-@dataclass
+@dataclass(slots=True, repr=False, eq=False)
 class NoiseConfig:
     enabled: bool = True
     gaussian: GaussianNoiseConfig = field(default_factory=GaussianNoiseConfig)
@@ -101,7 +110,7 @@ class NoiseConfig:
     dropout: DropoutNoiseConfig = field(default_factory=DropoutNoiseConfig)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ObjectPrimitive:
     """Parametric primitive (cube, cylinder, ...)."""
 
@@ -112,7 +121,7 @@ class ObjectPrimitive:
     T_WO: SE3  # world_T_object
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ObjectCAD:
     """CAD mesh loaded from file (.stl/.obj/.ply...)."""
 
@@ -127,7 +136,7 @@ class ObjectCAD:
 ObjectSpec = Union[ObjectPrimitive, ObjectCAD]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True, repr=False, eq=False)
 class Config:
     render: RenderConfig
     rig: CameraRig
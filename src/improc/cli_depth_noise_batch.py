@@ -2,25 +2,135 @@
 from __future__ import annotations
 
 import argparse
-import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 from src.config.config_parser import load_config
-from src.improc.depth_noise import (
-    DropoutDepthNoise,
-    GaussianDepthNoise,
-    MultiplicativeDepthNoise,
-    QuantizationDepthNoise,
-    apply_noise_chain,
-    clamp_depth_to_zmax,
+from src.utils.io_utils import (
+    VIZ_PARAMS_STAMP,
+    is_up_to_date,
+    iter_manifest_columns,
+    params_stamp_matches,
+    write_params_stamp,
 )
-from src.improc.depth_viz import visualize_exr_to_png
-from src.improc.read_write_exr import read_exr_depth, write_exr_depth
+
+_ROW_KEYS = ('depth_exr_gt', 'depth_exr_noisy', 'depth_viz_noisy', 'depth_viz_gt')
+
+# Per-process noisy-depth buffers by frame shape, reused across rows (each row
+# is done with its buffer before the next one starts)
+_NOISY_BUFFERS: dict = {}
+
+
+def _init_worker() -> None:
+    """Fresh noise RNG state per worker (forked workers would otherwise all
+    inherit the parent's state and draw identical noise); one OpenCV (and
+    Numba kernel) thread per worker, since the pool already runs one process
+    per core."""
+    import cv2
+
+    from src.improc.depth_noise import reseed_noise_rng
+    from src.improc.depth_viz import set_kernel_threads
+
+    reseed_noise_rng()
+    cv2.setNumThreads(1)
+    set_kernel_threads(1)
+
+
+def _process_row(
+    rels: tuple,
+    row_index: int,
+    scene_root: Path,
+    zmax: float,
+    noises: list,
+    invalid_fill: float,
+    emit_depth_viz: bool,
+    force: bool = False,
+    seed: int | None = None,
+    viz_kwargs: dict | None = None,
+) -> str:
+    """Clamp GT, add noise, write noisy EXR (+ both viz PNGs) for one manifest row
+    (`rels`: its `_ROW_KEYS` columns). With `seed`, the row's noise comes from
+    its own Generator seeded by (seed, row_index): reproducible regardless of
+    which worker runs it. `viz_kwargs`: `viz_kwargs_from_config` output.
+    Module-level (picklable) so it can run in a worker process.
+    """
+    import numpy as np
+
+    from src.improc.depth_noise import apply_noise_chain, clamp_depth_to_zmax
+    from src.improc.depth_viz import visualize_exr_to_png
+    from src.improc.read_write_exr import (
+        exr_is_compressed,
+        exr_is_half,
+        read_exr_depth,
+        write_exr_depth,
+    )
+
+    exr_gt_rel, exr_noisy_rel, viz_noisy_rel, viz_gt_rel = rels  # `_ROW_KEYS` order
+    exr_gt_abs = scene_root / exr_gt_rel
+    exr_noisy_abs = scene_root / exr_noisy_rel
+    viz_noisy_abs = scene_root / viz_noisy_rel
+    viz_gt_abs = scene_root / viz_gt_rel
+
+    # keep the renderer's precision (--depth-precision) for GT and noisy
+    half = exr_is_half(str(exr_gt_abs))
+    d_gt = read_exr_depth(str(exr_gt_abs))
+    if zmax > 0.0:
+        d_raw, d_gt = d_gt, clamp_depth_to_zmax(d_gt, zmax)
+        # Rewrite only if clamping changed a pixel (NaN != NaN counts) or the
+        # renderer left compression to this pass (--exr-codec auto/NONE)
+        if not np.array_equal(d_gt, d_raw) or not exr_is_compressed(str(exr_gt_abs)):
+            write_exr_depth(str(exr_gt_abs), d_gt, half=half)
+
+    # apply noise on clamped GT
+    buf = _NOISY_BUFFERS.get(d_gt.shape)
+    if buf is None:
+        buf = _NOISY_BUFFERS[d_gt.shape] = np.empty(d_gt.shape, dtype=np.float32)
+    d_noisy = apply_noise_chain(
+        d_gt,
+        noises,
+        zmax_m=zmax,
+        invalid_fill=invalid_fill,
+        nonpositive_to_zero=True,
+        out=buf,
+        rng=None if seed is None else np.random.default_rng((seed, row_index)),
+    )
+
+    # write noisy exr
+    write_exr_depth(str(exr_noisy_abs), d_noisy, half=half)
+    if emit_depth_viz:
+        viz_kwargs = viz_kwargs or {}
+        # viz from NOISY
+        visualize_exr_to_png(d_noisy, str(viz_noisy_abs), zmax, **viz_kwargs)
+        # viz from GROUNDTRUTH: deterministic, so only if older than the GT EXR
+        # (checked after the clamp rewrite above, which bumps the EXR's mtime);
+        # `force` is also set by the caller when the viz params changed
+        if force or not is_up_to_date(exr_gt_abs, viz_gt_abs):
+            visualize_exr_to_png(d_gt, str(viz_gt_abs), zmax, **viz_kwargs)
+
+    return f'[NOISE] {Path(exr_gt_rel).name}: noisy_exr -> {exr_noisy_rel}, viz_noisy -> {viz_noisy_rel}, viz_gt -> {viz_gt_rel}'
 
 
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument('--config', required=True, help='Path to scene .toml')
+    ap.add_argument(
+        '--workers',
+        type=int,
+        default=os.cpu_count() or 1,
+        help='Worker processes for manifest rows (1: in-process, serial)',
+    )
+    ap.add_argument(
+        '--force',
+        action='store_true',
+        help='Re-render GT PNGs even if up to date with the EXRs and viz params',
+    )
+    ap.add_argument(
+        '--seed',
+        type=int,
+        default=None,
+        help='Seed for reproducible noise (default: fresh entropy per run)',
+    )
     args = ap.parse_args()
 
     cfg = load_config(args.config)
@@ -29,6 +139,15 @@ def main():
         print('[NOISE] noise.enabled = false → skip')
         return
 
+    # numpy/OpenCV/EXR stack only once there is work (not on the skip path)
+    from src.improc.depth_noise import (
+        DropoutDepthNoise,
+        GaussianDepthNoise,
+        MultiplicativeDepthNoise,
+        QuantizationDepthNoise,
+    )
+    from src.improc.depth_viz import viz_kwargs_from_config
+
     zmax = float(getattr(cfg.render, 'zmax_m', 0.0) or 0.0)
 
     scene_root = (Path(cfg.render.out_dir) / cfg.render.scene_id).resolve()
@@ -36,10 +155,6 @@ def main():
     if not manifest.exists():
         raise FileNotFoundError(f'manifest not found: {manifest}')
 
-    # load rows
-    with manifest.open(newline='') as f:
-        rows = list(csv.DictReader(f))
-
     # build noise chain from config
     noises = []
     ncfg = cfg.noise
@@ -54,48 +169,50 @@ def main():
 
     print(
         f'[NOISE] enabled={cfg.noise.enabled} | chain={[type(n).__name__ for n in noises]}'
+        f' | workers={args.workers}'
     )
 
-    for r in rows:
-        exr_gt_rel = r.get('depth_exr_gt')
-        exr_noisy_rel = r.get('depth_exr_noisy')
-        viz_noisy_rel = r.get('depth_viz_noisy')
-        viz_gt_rel = r.get('depth_viz_gt')
-        if None in (exr_gt_rel, exr_noisy_rel, viz_noisy_rel, viz_gt_rel):
-            raise KeyError(
-                'manifest must contain depth_exr_gt, depth_exr_noisy, depth_viz_noisy, and depth_viz_gt'
-            )
-        exr_gt_abs = (scene_root / exr_gt_rel).resolve()
-        exr_noisy_abs = (scene_root / exr_noisy_rel).resolve()
-        viz_noisy_abs = (scene_root / viz_noisy_rel).resolve()
-        viz_gt_abs = (scene_root / viz_gt_rel).resolve()
-
-        d_gt = read_exr_depth(str(exr_gt_abs))
-        if zmax > 0.0:
-            d_gt = clamp_depth_to_zmax(d_gt, zmax)
-            write_exr_depth(str(exr_gt_abs), d_gt)
-
-        # apply noise on clamped GT
-        d_noisy = apply_noise_chain(
-            d_gt,
-            noises,
-            zmax_m=zmax,
-            invalid_fill=cfg.noise.dropout.fill,
-            nonpositive_to_zero=True,
-        )
-
-        # write noisy exr
-        write_exr_depth(str(exr_noisy_abs), d_noisy)
-        # viz from NOISY
-        visualize_exr_to_png(
-            d_noisy, str(viz_noisy_abs), zmax, invalid_color=(0, 180, 0)
-        )
-        # viz from GROUNDTRUTH
-        visualize_exr_to_png(d_gt, str(viz_gt_abs), zmax, invalid_color=(0, 180, 0))
-
-        print(
-            f'[NOISE] {Path(exr_gt_rel).name}: noisy_exr -> {exr_noisy_rel}, viz_noisy -> {viz_noisy_rel}, viz_gt -> {viz_gt_rel}'
-        )
+    # GT PNGs skipped as up to date must match the noisy ones just written:
+    # re-render them all when the viz params differ from the last run's. The
+    # stamp is removed first and rewritten only once every row is done.
+    viz_kwargs = viz_kwargs_from_config(cfg)
+    viz_params = {'zmax_m': zmax, **viz_kwargs}
+    stamp = scene_root / VIZ_PARAMS_STAMP
+    force = args.force
+    if cfg.render.emit_depth_viz and not params_stamp_matches(stamp, viz_params):
+        if stamp.exists():
+            print('[NOISE] depth viz params changed → re-rendering GT PNGs')
+        stamp.unlink(missing_ok=True)
+        force = True
+
+    row_args = (
+        scene_root,
+        zmax,
+        noises,
+        ncfg.dropout.fill,
+        cfg.render.emit_depth_viz,
+        force,
+        args.seed,
+        viz_kwargs,
+    )
+    # rows are streamed: one tuple of the needed columns at a time
+    with manifest.open(newline='') as f:
+        rows = iter_manifest_columns(f, _ROW_KEYS)
+        if args.workers <= 1:
+            for k, rels in enumerate(rows):
+                print(_process_row(rels, k, *row_args))
+        else:
+            # Rows are independent (read GT, write own outputs); results come
+            # back in manifest order and a failed row re-raises here
+            with ProcessPoolExecutor(args.workers, initializer=_init_worker) as pool:
+                futures = [
+                    pool.submit(_process_row, rels, k, *row_args)
+                    for k, rels in enumerate(rows)
+                ]
+                for fut in futures:
+                    print(fut.result())
+    if cfg.render.emit_depth_viz:
+        write_params_stamp(stamp, viz_params)
 
 
 if __name__ == '__main__':
@@ -6,22 +6,94 @@ Usage:
 from __future__ import annotations
 
 import argparse
-import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
 
 from src.config.config_parser import load_config
-from src.improc.depth_noise import clamp_depth_to_zmax
-from src.improc.depth_viz import visualize_exr_to_png
-from src.improc.read_write_exr import read_exr_depth
+from src.utils.io_utils import (
+    VIZ_PARAMS_STAMP,
+    is_up_to_date,
+    iter_manifest_columns,
+    params_stamp_matches,
+    write_params_stamp,
+)
+
+# Manifest columns per row, in the order `_viz_row` unpacks them
+_ROW_KEYS = ('depth_exr_gt', 'depth_viz_gt', 'depth_exr_noisy', 'depth_viz_noisy')
+
+
+def _init_worker() -> None:
+    """One OpenCV (and Numba kernel) thread per worker, since the pool already
+    runs one process per core."""
+    import cv2
+
+    from src.improc.depth_viz import set_kernel_threads
+
+    cv2.setNumThreads(1)
+    set_kernel_threads(1)
+
+
+def _viz_one(
+    exr_abs: Path, viz_abs: Path, zmax: float, label: str, viz_kwargs: dict
+) -> str:
+    from src.improc.depth_noise import clamp_depth_to_zmax
+    from src.improc.depth_viz import visualize_exr_to_png
+    from src.improc.read_write_exr import read_exr_depth
+
+    depth = read_exr_depth(str(exr_abs))
+    if zmax > 0.0:
+        depth = clamp_depth_to_zmax(depth, zmax)
+    visualize_exr_to_png(depth, str(viz_abs), zmax, **viz_kwargs)
+    return f'[POST] {label} EXR -> PNG16 | {exr_abs} -> {viz_abs} | zmax={zmax}'
+
+
+def _viz_row(
+    rels: tuple, scene_root: Path, zmax: float, force: bool, viz_kwargs: dict
+) -> list:
+    """GT and noisy PNGs for one manifest row (`rels`: its `_ROW_KEYS` columns),
+    each skipped if newer than its EXR (the caller sets `force` when the viz
+    params changed). Module-level (picklable) so it can run in a worker
+    process; returns the log lines.
+    """
+    exr_gt_rel, viz_gt_rel, exr_noisy_rel, viz_noisy_rel = rels
+    logs = []
+    for label, exr_rel, viz_rel in (
+        ('GT', exr_gt_rel, viz_gt_rel),
+        ('NOISY', exr_noisy_rel, viz_noisy_rel),
+    ):
+        exr_abs = scene_root / exr_rel
+        viz_abs = scene_root / viz_rel
+        if force or not is_up_to_date(exr_abs, viz_abs):
+            logs.append(_viz_one(exr_abs, viz_abs, zmax, label, viz_kwargs))
+    return logs
 
 
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument('--config', required=True, help='Path to scene .toml')
+    ap.add_argument(
+        '--force',
+        action='store_true',
+        help='Re-render PNGs even if up to date with the EXRs and viz params',
+    )
+    ap.add_argument(
+        '--workers',
+        type=int,
+        default=os.cpu_count() or 1,
+        help='Worker processes for manifest rows (1: in-process, serial)',
+    )
     args = ap.parse_args()
 
     cfg = load_config(args.config)
     print(f'[VIZ] loaded config: {args.config}')
+    if not cfg.render.emit_depth_viz:
+        print('[VIZ] render.emit_depth_viz = false → skip')
+        return
+
+    # numpy/OpenCV/EXR stack only once there is work (not on the skip path)
+    from src.improc.depth_viz import viz_kwargs_from_config
 
     zmax = float(getattr(cfg.render, 'zmax_m', 0.0) or 0.0)
 
@@ -30,42 +102,41 @@ def main():
     if not manifest.exists():
         raise FileNotFoundError(f'manifest not found: {manifest}')
 
+    # An mtime skip alone would keep PNGs rendered with other viz params:
+    # re-render them all when the params differ from the last run's. The stamp
+    # is removed first and rewritten only once every row is done.
+    viz_kwargs = viz_kwargs_from_config(cfg)
+    viz_params = {'zmax_m': zmax, **viz_kwargs}
+    stamp = scene_root / VIZ_PARAMS_STAMP
+    force = args.force
+    if not params_stamp_matches(stamp, viz_params):
+        if stamp.exists():
+            print('[VIZ] depth viz params changed → re-rendering all PNGs')
+        stamp.unlink(missing_ok=True)
+        force = True
+
+    viz_row = partial(
+        _viz_row,
+        scene_root=scene_root,
+        zmax=zmax,
+        force=force,
+        viz_kwargs=viz_kwargs,
+    )
+    # rows are streamed: one tuple of the needed columns at a time
     with manifest.open(newline='') as f:
-        rows = list(csv.DictReader(f))
-
-    for r in rows:
-        # Groundtruth
-        exr_gt_rel = r.get('depth_exr_gt')
-        viz_gt_rel = r.get('depth_viz_gt')
-        if exr_gt_rel is None or viz_gt_rel is None:
-            raise KeyError('manifest must contain both depth_exr_gt and depth_viz_gt')
-        exr_gt_abs = (scene_root / exr_gt_rel).resolve()
-        viz_gt_abs = (scene_root / viz_gt_rel).resolve()
-        print(f'[POST] GT EXR -> PNG16 | {exr_gt_abs} -> {viz_gt_abs} | zmax={zmax}')
-
-        depth_gt = read_exr_depth(str(exr_gt_abs))
-        if zmax > 0.0:
-            depth_gt = clamp_depth_to_zmax(depth_gt, zmax)
-        visualize_exr_to_png(depth_gt, str(viz_gt_abs), zmax, invalid_color=(0, 180, 0))
-
-        # Noisy
-        exr_noisy_rel = r.get('depth_exr_noisy')
-        viz_noisy_rel = r.get('depth_viz_noisy')
-        if exr_noisy_rel is None or viz_noisy_rel is None:
-            raise KeyError(
-                'manifest must contain both depth_exr_noisy and depth_viz_noisy'
-            )
-        exr_noisy_abs = (scene_root / exr_noisy_rel).resolve()
-        viz_noisy_abs = (scene_root / viz_noisy_rel).resolve()
-        print(
-            f'[POST] NOISY EXR -> PNG16 | {exr_noisy_abs} -> {viz_noisy_abs} | zmax={zmax}'
-        )
-        depth_noisy = read_exr_depth(str(exr_noisy_abs))
-        if zmax > 0.0:
-            depth_noisy = clamp_depth_to_zmax(depth_noisy, zmax)
-        visualize_exr_to_png(
-            depth_noisy, str(viz_noisy_abs), zmax, invalid_color=(0, 180, 0)
-        )
+        rows = iter_manifest_columns(f, _ROW_KEYS)
+        if args.workers <= 1:
+            for rels in rows:
+                for line in viz_row(rels):
+                    print(line)
+        else:
+            # Rows are independent (read EXRs, write own PNGs); results come back
+            # in manifest order, in chunks to amortize the IPC per (small) task
+            with ProcessPoolExecutor(args.workers, initializer=_init_worker) as pool:
+                for logs in pool.map(viz_row, rows, chunksize=8):
+                    for line in logs:
+                        print(line)
+    write_params_stamp(stamp, viz_params)
 
 
 if __name__ == '__main__':
@@ -6,6 +6,17 @@ from typing import List, Optional, Tuple
 
 import numpy as np
 
+# Default noise RNG (PCG64 Generator) when no `rng` is passed. Forked worker
+# processes inherit its state, so each one must call `reseed_noise_rng()` or
+# they all draw identical noise.
+_RNG = np.random.default_rng()
+
+
+def reseed_noise_rng(seed: Optional[int] = None) -> None:
+    """Reset the noise RNG (fresh OS entropy if `seed` is None)."""
+    global _RNG
+    _RNG = np.random.default_rng(seed)
+
 
 # -----------------------------
 # Base noise API (mask-aware)
@@ -13,19 +24,30 @@ import numpy as np
 class DepthNoiseModel:
     """
     Mask-aware noise operator.
-    Each noise must implement `apply(d, valid_mask)` and return (d, valid_mask).
-    - d: float32 depth (meters)
+    Each noise must implement `apply_(d, valid_mask, rng)`, which works in place
+    and draws from `rng` (a np.random.Generator) only.
+    - d: float32 depth (meters), C-contiguous
     - valid_mask: boolean mask where measurements are currently valid
     The operator may modify `d` only at valid_mask==True, and may also shrink valid_mask
       (e.g., dropout). It must NEVER create new valid pixels outside the mask.
+    Random draws cover only the valid pixels (no full-frame noise temporaries).
     """
 
+    def apply_(
+        self, d: np.ndarray, valid_mask: np.ndarray, rng: np.random.Generator
+    ) -> None:
+        raise NotImplementedError
+
     def apply(
         self,
         d: np.ndarray,
         valid_mask: np.ndarray,
+        rng: Optional[np.random.Generator] = None,
     ) -> Tuple[np.ndarray, np.ndarray]:
-        raise NotImplementedError
+        """Out-of-place variant: returns new (d, valid_mask), inputs untouched."""
+        d, valid_mask = d.copy(), valid_mask.copy()
+        self.apply_(d, valid_mask, _RNG if rng is None else rng)
+        return d, valid_mask
 
 
 @dataclass
@@ -34,13 +56,12 @@ class GaussianDepthNoise(DepthNoiseModel):
 
     sigma_m: float
 
-    def apply(self, d, valid_mask):
+    def apply_(self, d, valid_mask, rng):
         if self.sigma_m <= 0:
-            return d, valid_mask
-        n = np.random.normal(0.0, self.sigma_m, size=d.shape).astype(np.float32)
-        d = d.copy()
-        d[valid_mask] = (d[valid_mask] + n[valid_mask]).astype(np.float32)
-        return d, valid_mask
+            return
+        n = rng.standard_normal(np.count_nonzero(valid_mask), dtype=np.float32)
+        n *= np.float32(self.sigma_m)
+        d[valid_mask] += n
 
 
 @dataclass
@@ -49,15 +70,13 @@ class MultiplicativeDepthNoise(DepthNoiseModel):
 
     sigma_rel: float
 
-    def apply(self, d, valid_mask):
+    def apply_(self, d, valid_mask, rng):
         if self.sigma_rel <= 0:
-            return d, valid_mask
-        scale = (1.0 + np.random.normal(0.0, self.sigma_rel, size=d.shape)).astype(
-            np.float32
-        )
-        d = d.copy()
-        d[valid_mask] = (d[valid_mask] * scale[valid_mask]).astype(np.float32)
-        return d, valid_mask
+            return
+        n = rng.standard_normal(np.count_nonzero(valid_mask), dtype=np.float32)
+        n *= np.float32(self.sigma_rel)
+        n += np.float32(1.0)
+        d[valid_mask] *= n
 
 
 @dataclass
@@ -66,15 +85,20 @@ class QuantizationDepthNoise(DepthNoiseModel):
 
     step_m: float
 
-    def apply(self, d, valid_mask):
+    def apply_(self, d, valid_mask, rng):
         if self.step_m <= 0:
-            return d, valid_mask
-        d = d.copy()
-        v = d[valid_mask]
-        d[valid_mask] = (
-            np.round(v / self.step_m).astype(np.float32) * self.step_m
-        ).astype(np.float32)
-        return d, valid_mask
+            return
+        v = d[valid_mask]  # gathered copy: divide, round, scale it in place
+        step = np.float32(self.step_m)
+        np.divide(v, step, out=v)
+        np.rint(v, out=v)
+        v *= step
+        d[valid_mask] = v
+
+
+# Below this dropout probability, drops are sampled by index instead of one
+# uniform per valid pixel
+_SPARSE_DROPOUT_P = 0.05
 
 
 @dataclass
@@ -84,29 +108,39 @@ class DropoutDepthNoise(DepthNoiseModel):
     p: float
     fill: float = 0.0
 
-    def apply(self, d, valid_mask):
+    def apply_(self, d, valid_mask, rng):
         if self.p <= 0:
-            return d, valid_mask
-        drop = (
-            np.random.rand(*d.shape) < self.p
-        ) & valid_mask  # only drop where currently valid
-        if not np.any(drop):
-            return d, valid_mask
-        d = d.copy()
-        d[drop] = self.fill
-        valid_mask = valid_mask.copy()
-        valid_mask[drop] = False
-        return d, valid_mask
+            return
+        idx = np.flatnonzero(valid_mask)  # only drop where currently valid
+        if self.p < _SPARSE_DROPOUT_P:
+            # same distribution as per-pixel Bernoulli(p): a Binomial count of
+            # drops, then a uniform subset of that size (~p*N draws, not N)
+            k = rng.binomial(idx.size, self.p)
+            drop = rng.choice(idx, size=k, replace=False, shuffle=False)
+        else:
+            drop = idx[rng.random(idx.size, dtype=np.float32) < self.p]
+        if drop.size == 0:
+            return
+        d.reshape(-1)[drop] = self.fill
+        valid_mask.reshape(-1)[drop] = False
 
 
 # -----------------------------
 # Utilities
 # -----------------------------
-def _initial_valid_mask(d: np.ndarray, zmax_m: Optional[float]) -> np.ndarray:
-    is_finite_pos = np.isfinite(d) & (d > 0.0)
+def _valid_mask(
+    d: np.ndarray,
+    zmax_m: Optional[float],
+    nonpositive_invalid: bool = True,
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """isfinite [& >0] [& <=zmax], combined in place in one bool buffer."""
+    valid = np.isfinite(d, out=out)
+    if nonpositive_invalid:
+        valid &= d > 0.0
     if zmax_m is not None and zmax_m > 0:
-        return is_finite_pos & (d <= zmax_m)
-    return is_finite_pos
+        valid &= d <= zmax_m
+    return valid
 
 
 # -----------------------------
@@ -119,6 +153,8 @@ def apply_noise_chain(
     zmax_m: Optional[float] = None,
     invalid_fill: float = 0.0,
     nonpositive_to_zero: bool = True,
+    out: Optional[np.ndarray] = None,
+    rng: Optional[np.random.Generator] = None,
 ) -> np.ndarray:
     """
     Noise pipeline with robust invalid handling:
@@ -126,31 +162,38 @@ def apply_noise_chain(
       2) Apply each noise with mask-awareness (only valid pixels are modified).
       3) Sanitize: remove non-finite / non-positive; re-apply zmax validity.
       4) Set invalid pixels to `invalid_fill` (default: 0.0).
+    Every step is elementwise, so `depth_m` may also be an (N, H, W) stack of
+    equal-size frames, noised in one call.
+    `out` (C-contiguous float32, same shape) is used as the working buffer and
+    returned, instead of allocating one per call. All noises draw from `rng`
+    (default: the module RNG); pass a seeded Generator for reproducible noise.
     """
-    d = depth_m.astype(np.float32, copy=True)
+    if out is None:
+        d = np.array(depth_m, dtype=np.float32, order='C')  # own, C-contiguous buffer
+    else:
+        if out.shape != depth_m.shape or out.dtype != np.float32:
+            raise ValueError(
+                f'out must be float32 {depth_m.shape}, got {out.dtype} {out.shape}'
+            )
+        if not out.flags.c_contiguous:
+            raise ValueError('out must be C-contiguous')
+        d = out
+        np.copyto(d, depth_m)
 
     # Step 1: initial validity (zmax included)
-    valid = _initial_valid_mask(d, zmax_m)
+    valid = _valid_mask(d, zmax_m)
 
-    # Step 2: run noises
+    # Step 2: run noises (in place: `d` and `valid` are this chain's own buffers)
+    rng = _RNG if rng is None else rng
     for n in noises:
-        d, valid = n.apply(d, valid)
-
-    # Step 3: sanitize values after noise
-    if nonpositive_to_zero:
-        is_finite_pos = np.isfinite(d) & (d > 0.0)
-    else:
-        is_finite_pos = np.isfinite(d)
+        n.apply_(d, valid, rng)
 
-    if zmax_m is not None and zmax_m > 0:
-        valid = is_finite_pos & (d <= zmax_m)
-    else:
-        valid = is_finite_pos
+    # Step 3: sanitize values after noise (recomputed into the same buffer)
+    valid = _valid_mask(d, zmax_m, nonpositive_to_zero, out=valid)
 
     # Step 4: finalize invalids
-    out = d.copy()
-    out[~valid] = invalid_fill
-    return out.astype(np.float32)
+    np.copyto(d, np.float32(invalid_fill), where=np.logical_not(valid, out=valid))
+    return d
 
 
 # -----------------------------
@@ -164,11 +207,7 @@ def clamp_depth_to_zmax(
     """Clamp depth to [0, zmax]; set values beyond zmax to 0 (simulate no return).
     Non-finite or non-positive values become 0 if nonpositive_to_zero is True.
     """
-    x = depth_m.astype(np.float32)
-    if nonpositive_to_zero:
-        x = np.where(np.isfinite(x) & (x > 0.0), x, 0.0).astype(np.float32)
-    else:
-        x = np.where(np.isfinite(x), x, 0.0).astype(np.float32)
-    if zmax_m is not None and zmax_m > 0:
-        x = np.where(x <= zmax_m, x, 0.0).astype(np.float32)
+    x = np.array(depth_m, dtype=np.float32)  # the one (owned) output copy
+    keep = _valid_mask(x, zmax_m, nonpositive_to_zero)
+    np.copyto(x, np.float32(0.0), where=np.logical_not(keep, out=keep))
     return x
@@ -1,23 +1,159 @@
 """Depth visualization from EXR without using Blender compositor.
-Reads a float Z(m) EXR → clamp [0,zmax] → normalize [0,1] → save 16-bit PNG.
+Reads a float Z(m) EXR → clamp [0,zmax] → normalize [0,1] → save 16-bit PNG
+(or a 1/z disparity code, see `depth_to_disparity_u16`).
 """
 
 from __future__ import annotations
 
 import os
+from typing import Literal
 
+import cv2
 import numpy as np
 
+# zlib level for the viz PNGs (0-9). Deflate dominates the write time and these
+# are previews, so favor speed; pinned here rather than left to the OpenCV build
+PNG_LEVEL = int(os.environ.get('DEPTH_VIZ_PNG_LEVEL', '1'))
+# An explicit level resets OpenCV's strategy to zlib's default, so RLE (good on
+# flat depth regions) must follow it
+_PNG_PARAMS = [
+    cv2.IMWRITE_PNG_COMPRESSION,
+    PNG_LEVEL,
+    cv2.IMWRITE_PNG_STRATEGY,
+    cv2.IMWRITE_PNG_STRATEGY_RLE,
+]
+
+# Optional: Numba-compiled single-pass kernels (one read of the depth, one write
+# of the PNG pixels). Falls back to the NumPy passes if not installed.
+try:
+    import numba
+except Exception:  # pragma: no cover
+    numba = None  # type: ignore
+
+if numba is not None:
+
+    @numba.njit(parallel=True, cache=True)
+    def _depth_to_u16(d, zmax, out):
+        h, w = d.shape
+        for i in numba.prange(h):  # rows split across threads
+            for j in range(w):
+                v = d[i, j]
+                if v > 0 and v <= zmax:  # NaN fails both, +inf the second
+                    out[i, j] = np.uint16(v / zmax * np.float32(65535.0))
+                else:
+                    out[i, j] = 0
+
+    @numba.njit(parallel=True, cache=True)
+    def _depth_to_bgr8(d, zmax, invalid_bgr, out):
+        h, w = d.shape
+        for i in numba.prange(h):  # rows split across threads
+            for j in range(w):
+                v = d[i, j]
+                if v > 0 and v <= zmax:
+                    g = np.uint8(min(v / zmax * np.float32(255.0), np.float32(255.0)))
+                    out[i, j, 0] = g
+                    out[i, j, 1] = g
+                    out[i, j, 2] = g
+                else:
+                    out[i, j, 0] = invalid_bgr[0]
+                    out[i, j, 1] = invalid_bgr[1]
+                    out[i, j, 2] = invalid_bgr[2]
+
+
+def set_kernel_threads(n: int) -> None:
+    """Threads for the Numba viz kernels (default: all cores). Process pools
+    that already run one worker per core should set 1."""
+    if numba is not None:
+        numba.set_num_threads(max(1, min(n, numba.config.NUMBA_NUM_THREADS)))
+
+
+# Output directories already created by this process (rows share a handful)
+_MADE_DIRS: set = set()
+
+
+def _ensure_parent_dir(path: str) -> None:
+    parent = os.path.dirname(path)
+    if parent not in _MADE_DIRS:
+        os.makedirs(parent, exist_ok=True)
+        _MADE_DIRS.add(parent)
+
+
+# PNG pixel buffers by (shape, dtype), reused across calls in this process:
+# each call hands its buffer to cv2.imwrite before returning (not thread-safe)
+_PNG_BUFFERS: dict = {}
+
+
+def _png_buffer(shape: tuple, dtype) -> np.ndarray:
+    key = (shape, np.dtype(dtype))
+    buf = _PNG_BUFFERS.get(key)
+    if buf is None:
+        buf = _PNG_BUFFERS[key] = np.empty(shape, dtype=dtype)
+    return buf
+
+
+def depth_to_disparity_u16(d: np.ndarray, znear_m: float, zmax_m: float) -> np.ndarray:
+    """Non-linear (1/z) uint16 code for depth in [znear, zmax]: more code
+    points near the camera, where relative depth error matters most.
+        Y = round((2^16 - 3) * (1/z - 1/zmax) / (1/znear - 1/zmax)) + 2
+    Reserved: 0 = out of [znear, zmax], 1 = invalid (non-finite or <= 0).
+    Inverse (Y >= 2): 1/z = (Y - 2) / (2^16 - 3) * (1/znear - 1/zmax) + 1/zmax
+    """
+    if not 0.0 < znear_m < zmax_m:
+        raise ValueError(f'need 0 < znear_m < zmax_m, got {znear_m}, {zmax_m}')
+    inv_far = 1.0 / zmax_m
+    scale = (2**16 - 3) / (1.0 / znear_m - inv_far)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        y = np.rint((1.0 / d.astype(np.float64) - inv_far) * scale) + 2.0
+    out = np.clip(np.nan_to_num(y), 2, 65535).astype(np.uint16)
+    out[(d < znear_m) | (d > zmax_m)] = 0
+    out[~(np.isfinite(d) & (d > 0))] = 1
+    return out
+
+
+def viz_kwargs_from_config(cfg) -> dict:
+    """`visualize_exr_to_png` keyword arguments for the postprocess CLIs, from
+    `render.depth_viz_mode` / `render.depth_viz_znear_m`."""
+    if cfg.render.depth_viz_mode == 'disparity':
+        znear = cfg.render.depth_viz_znear_m or cfg.rig.depth_intrinsics.clip_start
+        return {'mode': 'disparity', 'znear_m': float(znear)}
+    return {'invalid_color': (0, 180, 0)}
+
 
 def visualize_exr_to_png(
     depth_m: np.ndarray,
     png_path: str,
     zmax_m: float,
     invalid_color: tuple[int, int, int] | None = None,
+    mode: Literal['linear', 'disparity'] = 'linear',
+    znear_m: float | None = None,
 ) -> None:
-    import cv2
+    """`mode='disparity'` writes the 16-bit `depth_to_disparity_u16` code
+    (needs zmax_m and znear_m, no invalid_color) instead of linear depth."""
+    d = np.ascontiguousarray(depth_m, dtype=np.float32)  # read-only below
+    if mode == 'disparity':
+        if invalid_color is not None or znear_m is None or not zmax_m:
+            raise ValueError(
+                'disparity mode needs zmax_m and znear_m, and no invalid_color'
+            )
+        _ensure_parent_dir(png_path)
+        cv2.imwrite(png_path, depth_to_disparity_u16(d, znear_m, zmax_m), _PNG_PARAMS)
+        return
+    if mode != 'linear':
+        raise ValueError(f'unknown viz mode: {mode!r}')
+    if numba is not None and zmax_m and zmax_m > 0:
+        # valid = finite, > 0 and <= zmax: tested per pixel inside the kernel
+        _ensure_parent_dir(png_path)
+        if invalid_color is None:
+            png16 = _png_buffer(d.shape, np.uint16)
+            _depth_to_u16(d, np.float32(zmax_m), png16)
+            cv2.imwrite(png_path, png16, _PNG_PARAMS)
+        else:
+            bgr = _png_buffer(d.shape + (3,), np.uint8)
+            ic = np.array(invalid_color[::-1], dtype=np.uint8)
+            _depth_to_bgr8(d, np.float32(zmax_m), ic, bgr)
+            cv2.imwrite(png_path, bgr, _PNG_PARAMS)
+        return
 
-    d = depth_m.astype(np.float32)
     is_finite_pos = np.isfinite(d) & (d > 0)
     if zmax_m and zmax_m > 0:
         is_valid = is_finite_pos & (d <= zmax_m)
@@ -34,27 +170,35 @@ def visualize_exr_to_png(
 
     if invalid_color is None:
         # 16-bit single channel, invalid pixel has value 0
-        png16 = (d_clip / zmax_m * 65535.0).astype(np.uint16)
-        os.makedirs(os.path.dirname(png_path), exist_ok=True)
-        cv2.imwrite(png_path, png16)
+        d_clip /= zmax_m
+        d_clip *= 65535.0
+        png16 = _png_buffer(d.shape, np.uint16)
+        np.copyto(png16, d_clip, casting='unsafe')  # truncates, as astype does
+        _ensure_parent_dir(png_path)
+        cv2.imwrite(png_path, png16, _PNG_PARAMS)
     else:
         # valid -> 8-bit grayscale, invalid -> "invalid color" e.g. green
         g = np.zeros_like(d, dtype=np.uint8)
         g[is_valid] = np.clip((d_clip[is_valid] / zmax_m) * 255.0, 0, 255).astype(
             np.uint8
         )
-        rgb = np.stack([g, g, g], axis=-1)  # grayscale to 3-channel
+        # grayscale straight to OpenCV's BGR order (no RGB stack + reversal)
+        bgr = cv2.cvtColor(
+            g, cv2.COLOR_GRAY2BGR, dst=_png_buffer(d.shape + (3,), np.uint8)
+        )
 
-        # paint invalid pixels with invalid_color
-        ic = tuple(int(c) for c in invalid_color)
+        # paint invalid pixels with invalid_color (given as RGB)
         mask = ~is_valid
         if np.any(mask):
-            rgb[mask] = np.array(ic, dtype=np.uint8)
+            bgr[mask] = np.array([int(c) for c in invalid_color[::-1]], dtype=np.uint8)
 
-        # transform RGB->BGR since OpenCV expects BGR
-        bgr = rgb[..., ::-1]
-        os.makedirs(os.path.dirname(png_path), exist_ok=True)
-        cv2.imwrite(png_path, bgr)
+        _ensure_parent_dir(png_path)
+        cv2.imwrite(png_path, bgr, _PNG_PARAMS)
 
 
-__all__ = ['visualize_exr_to_png']
+__all__ = [
+    'depth_to_disparity_u16',
+    'set_kernel_threads',
+    'visualize_exr_to_png',
+    'viz_kwargs_from_config',
+]
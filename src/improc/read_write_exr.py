@@ -1,20 +1,120 @@
 import os
+import struct
 
 import cv2
 import numpy as np
 
+# Optional: native OpenEXR binding (faster, handles half/1-channel Blender EXRs
+# that some OpenCV builds mishandle). Falls back to OpenCV if not installed.
+try:
+    import Imath
+    import OpenEXR
+except Exception:  # pragma: no cover
+    OpenEXR = None  # type: ignore
+    Imath = None  # type: ignore
+
+# Preferred depth channel names: Blender BW EXR writes 'V'
+_DEPTH_CHANNELS = ('V', 'Y', 'Z', 'R', 'G', 'B')
+
+
+def _read_exr_depth_openexr(path: str) -> np.ndarray:
+    f = OpenEXR.InputFile(path)
+    try:
+        header = f.header()
+        dw = header['dataWindow']
+        w = dw.max.x - dw.min.x + 1
+        h = dw.max.y - dw.min.y + 1
+        channels = header['channels']
+        name = next((c for c in _DEPTH_CHANNELS if c in channels), None)
+        if name is None:
+            name = sorted(channels)[0]
+        # the library converts HALF -> FLOAT while decoding
+        raw = f.channel(name, Imath.PixelType(Imath.PixelType.FLOAT))
+    finally:
+        f.close()
+    # zero-copy view of the decoded bytes (read-only)
+    return np.frombuffer(raw, dtype=np.float32).reshape(h, w)
+
 
 def read_exr_depth(path: str) -> np.ndarray:
+    """HxW float32 depth.
+
+    With OpenEXR installed the result is a read-only view of the decoded
+    buffer: copy it (e.g. ``depth.copy()``) before modifying it in place.
+    Clamp and noise already write to new arrays.
+    """
+    if OpenEXR is not None:
+        try:
+            return _read_exr_depth_openexr(path)
+        except Exception as e:
+            raise IOError(f'Failed to read EXR: {path} ({e})') from e
     img = cv2.imread(path, cv2.IMREAD_UNCHANGED)  # returns float32 for EXR
     if img is None:
         raise IOError(f'Failed to read EXR: {path}')
     if img.ndim == 3:
         img = img[..., 0]  # take first channel
-    return img.astype(np.float32)
+    return img.astype(np.float32, copy=False)
+
+
+# Same codec as the renderer's depth EXRs (per-scanline ZIP); older OpenCV
+# builds without the flag keep their default
+_EXR_WRITE_PARAMS = (
+    [cv2.IMWRITE_EXR_COMPRESSION, cv2.IMWRITE_EXR_COMPRESSION_ZIPS]
+    if hasattr(cv2, 'IMWRITE_EXR_COMPRESSION_ZIPS')
+    else []
+)
+
+
+# OpenEXR channel pixel types (chlist attribute) and compression enum
+_EXR_PIXEL_HALF = 1
+_EXR_NO_COMPRESSION = 0
+
+
+def _exr_header(path: str) -> dict:
+    """{attribute name: raw value bytes} of a scanline EXR header.
+    Only the header is read (plain attribute walk, no decoder needed).
+    """
+    attrs = {}
+    with open(path, 'rb') as f:
+        if f.read(8)[:4] != b'\x76\x2f\x31\x01':
+            raise IOError(f'Not an EXR file: {path}')
+        while name := _read_cstr(f):
+            _read_cstr(f)  # type name
+            (size,) = struct.unpack('<i', f.read(4))
+            attrs[name.decode()] = f.read(size)
+    return attrs
+
+
+def exr_is_half(path: str) -> bool:
+    """True if every channel of the EXR is stored as half float."""
+    value = _exr_header(path).get('channels', b'\0')
+    # chlist: (name\0, int32 pixel type, 12 more bytes) per channel, then \0
+    types, i = [], 0
+    while value[i] != 0:
+        i = value.index(b'\0', i) + 1
+        types.append(struct.unpack_from('<i', value, i)[0])
+        i += 16
+    return bool(types) and all(t == _EXR_PIXEL_HALF for t in types)
+
+
+def exr_is_compressed(path: str) -> bool:
+    """False for EXRs written with NO_COMPRESSION (e.g. --exr-codec NONE)."""
+    return _exr_header(path).get('compression', b'\0')[0] != _EXR_NO_COMPRESSION
+
+
+def _read_cstr(f) -> bytes:
+    out = bytearray()
+    while (c := f.read(1)) not in (b'', b'\0'):
+        out += c
+    return bytes(out)
 
 
-def write_exr_depth(path: str, depth: np.ndarray) -> None:
+def write_exr_depth(path: str, depth: np.ndarray, half: bool = False) -> None:
+    """Write depth as a 1-channel EXR (half float if `half`, else float32)."""
     os.makedirs(os.path.dirname(path), exist_ok=True)
-    ok = cv2.imwrite(path, depth.astype(np.float32))
+    params = list(_EXR_WRITE_PARAMS)
+    if half and hasattr(cv2, 'IMWRITE_EXR_TYPE_HALF'):
+        params += [cv2.IMWRITE_EXR_TYPE, cv2.IMWRITE_EXR_TYPE_HALF]
+    ok = cv2.imwrite(path, depth.astype(np.float32, copy=False), params)
     if not ok:
         raise IOError(f'Failed to write EXR: {path}')
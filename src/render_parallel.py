@@ -0,0 +1,220 @@
+"""Parallel sequence rendering: a pool of headless Blender processes.
+Frames are split round-robin into S shards (k % S) that W workers pull from a
+queue, so a slow shard does not leave the other workers idle. Shard manifests
+are merged into manifest.csv and shard pose archives into poses/poses.npz, then
+the depth noise/viz postprocess runs once.
+
+Usage (system Python, from the project root):
+  python -m src.render_parallel --config /abs/path/scene.toml --workers 2 --gpus 2
+  python -m src.render_parallel --config ... --workers 2 --shards 8
+Extra args after '--' are forwarded to blender_rgbd_render_seq.py.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import os
+import queue
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from src.config.config_parser import load_config
+from src.utils.io_utils import shard_manifest_name, shard_poses_name
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+def _render_shard(
+    blender_bin: str,
+    cfg_path: Path,
+    shard_id: int,
+    num_shards: int,
+    gpus: int,
+    extra: list[str],
+    slots: queue.Queue,
+) -> None:
+    """Render one shard in a headless Blender; raises CalledProcessError if it
+    fails (a Python error in the script included, via --python-exit-code)."""
+    env = os.environ.copy()
+    env['PYTHONPATH'] = os.pathsep.join(
+        p for p in (str(PROJECT_ROOT), env.get('PYTHONPATH', '')) if p
+    )
+    env.setdefault('SYS_PY', sys.executable)
+    # worker slot: held while this shard's Blender process runs
+    slot = slots.get()
+    if gpus > 0:
+        # pin one GPU per worker slot (round-robin) so workers do not contend
+        gpu = str(slot % gpus)
+        env['CUDA_VISIBLE_DEVICES'] = gpu
+        env['HIP_VISIBLE_DEVICES'] = gpu
+    cmd = [
+        blender_bin,
+        '--background',
+        '--python-use-system-env',
+        '--python-exit-code',  # Blender exits 0 after a script error otherwise
+        '1',
+        '--python',
+        str(PROJECT_ROOT / 'src' / 'blender_rgbd_render_seq.py'),
+        '--',
+        '--config',
+        str(cfg_path),
+        '--shard-id',
+        str(shard_id),
+        '--num-shards',
+        str(num_shards),
+        *extra,
+    ]
+    print(f'[PAR] shard {shard_id}/{num_shards} (worker {slot}): {" ".join(cmd)}')
+    try:
+        subprocess.run(cmd, env=env, cwd=PROJECT_ROOT, check=True)
+    finally:
+        slots.put(slot)
+
+
+def merge_shard_manifests(scene_root: Path, num_shards: int, num_frames: int) -> Path:
+    """Concatenate shard manifests (sorted by frame) into manifest.csv; every
+    frame of the sequence must be present exactly once."""
+    rows = []
+    shard_paths = [
+        scene_root / shard_manifest_name(k, num_shards) for k in range(num_shards)
+    ]
+    for path in shard_paths:
+        if path.exists():  # a shard may own no frames
+            with path.open(newline='') as f:
+                rows.extend(csv.DictReader(f))
+    if not rows:
+        raise RuntimeError(f'no shard manifests found in {scene_root}')
+    rows.sort(key=lambda r: int(r['frame']))
+    frames = [int(r['frame']) for r in rows]
+    if frames != list(range(num_frames)):
+        missing = sorted(set(range(num_frames)) - set(frames))
+        raise RuntimeError(
+            f'shard manifests cover {len(frames)} of {num_frames} frames'
+            f' (missing: {missing[:10]}{"..." if len(missing) > 10 else ""})'
+        )
+
+    manifest = scene_root / shard_manifest_name()
+    with manifest.open('w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+    for path in shard_paths:
+        path.unlink(missing_ok=True)
+    return manifest
+
+
+def merge_shard_poses(scene_root: Path, num_shards: int) -> Path:
+    """Concatenate shard pose archives (sorted by frame) into poses/poses.npz."""
+    import numpy as np
+
+    poses_dir = scene_root / 'poses'
+    shard_paths = [
+        poses_dir / shard_poses_name(k, num_shards) for k in range(num_shards)
+    ]
+    parts = []
+    for path in shard_paths:
+        if path.exists():  # a shard may own no frames
+            with np.load(path) as z:
+                parts.append({k: z[k] for k in ('frame', 'T_WC', 'T_WD', 'T_WO')})
+    if not parts:
+        raise RuntimeError(f'no shard pose archives found in {poses_dir}')
+    frame = np.concatenate([p['frame'] for p in parts])
+    order = np.argsort(frame, kind='stable')
+
+    merged = poses_dir / shard_poses_name()
+    np.savez(
+        merged,
+        frame=frame[order],
+        T_WC=np.concatenate([p['T_WC'] for p in parts])[order],
+        T_WD=np.concatenate([p['T_WD'] for p in parts])[order],
+        T_WO=parts[0]['T_WO'],  # the object is static: same in every shard
+    )
+    for path in shard_paths:
+        path.unlink(missing_ok=True)
+    return merged
+
+
+def main():
+    argv = sys.argv[1:]
+    extra = []
+    if '--' in argv:
+        extra = argv[argv.index('--') + 1 :]
+        argv = argv[: argv.index('--')]
+    ap = argparse.ArgumentParser(description='Parallel RGB-D sequence renderer')
+    ap.add_argument('--config', required=True, help='Path to scene .toml')
+    ap.add_argument('--workers', type=int, default=2, help='Blender processes')
+    ap.add_argument(
+        '--shards',
+        type=int,
+        default=0,
+        help='Frame shards queued for the workers (0: one per worker)',
+    )
+    ap.add_argument(
+        '--gpus', type=int, default=0, help='GPUs to pin workers to (0: no pinning)'
+    )
+    ap.add_argument('--blender', default=os.environ.get('BLENDER_BIN', 'blender'))
+    args = ap.parse_args(argv)
+    if args.workers < 1:
+        ap.error('--workers must be >= 1')
+    num_shards = args.shards or args.workers
+    if num_shards < args.workers:
+        ap.error('--shards must be >= --workers')
+
+    cfg_path = Path(args.config).resolve()
+    cfg = load_config(str(cfg_path))
+    # workers run with cwd=PROJECT_ROOT, so relative out_dir resolves from there
+    scene_root = (PROJECT_ROOT / cfg.render.out_dir / cfg.render.scene_id).resolve()
+
+    slots: queue.Queue = queue.Queue()
+    for w in range(args.workers):
+        slots.put(w)
+
+    # Each worker is a separate Blender process; threads only wait on them.
+    # Shards beyond --workers wait in the executor queue for a free worker.
+    with ThreadPoolExecutor(max_workers=args.workers) as ex:
+        futures = [
+            ex.submit(
+                _render_shard,
+                args.blender,
+                cfg_path,
+                k,
+                num_shards,
+                args.gpus,
+                extra,
+                slots,
+            )
+            for k in range(num_shards)
+        ]
+        failed = []
+        for k, fut in enumerate(futures):
+            try:
+                fut.result()
+            except subprocess.CalledProcessError as e:
+                print(f'[ERR] shard {k}/{num_shards} exited with {e.returncode}')
+                failed.append(k)
+    if failed:
+        # nothing is merged: the shard manifests stay for inspection/resume
+        raise SystemExit(f'[PAR] shards failed: {failed}')
+
+    manifest = merge_shard_manifests(
+        scene_root, num_shards, len(cfg.seq.camera_extrinsics)
+    )
+    print(f'[PAR] merged manifest: {manifest}')
+    poses = merge_shard_poses(scene_root, num_shards)
+    print(f'[PAR] merged poses: {poses}')
+
+    env = os.environ.copy()
+    env['PYTHONUNBUFFERED'] = '1'
+    for module in (
+        'src.improc.cli_depth_noise_batch',
+        'src.improc.cli_depth_viz_batch',
+    ):
+        cmd = [sys.executable, '-m', module, '--config', str(cfg_path)]
+        subprocess.run(cmd, env=env, cwd=PROJECT_ROOT, check=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,26 @@
+from __future__ import annotations
+
+import csv
+import json
+import os
+from operator import itemgetter
 from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator, Sequence, Tuple
+
+if TYPE_CHECKING:  # Blender-only; keeps this module importable from system Python
+    from mathutils import Matrix
 
-# --- Third-party (Blender) ---
-from mathutils import Matrix
+
+# Per-scene output subfolders (created once, before any rendering)
+OUTPUT_SUBDIRS = (
+    'rgb',
+    'depth_exr_gt',
+    'depth_exr_noisy',
+    'depth_viz_gt',
+    'depth_viz_noisy',
+    'poses',
+    'mask',
+)
 
 
 def ensure_dirs(base_out: str | Path, scene_id: str) -> Path:
@@ -10,22 +29,105 @@ def ensure_dirs(base_out: str | Path, scene_id: str) -> Path:
     scene_root = base / scene_id
 
     # Create required subdirectories
-    for name in (
-        'rgb',
-        'depth_exr_gt',
-        'depth_exr_noisy',
-        'depth_viz_gt',
-        'depth_viz_noisy',
-        'poses',
-        'mask',
-    ):
+    for name in OUTPUT_SUBDIRS:
         (scene_root / name).mkdir(parents=True, exist_ok=True)
 
     return scene_root
 
 
+def frame_stem_digits(num_frames: int) -> int:
+    """Zero-padding width of frame stems: at least 4, wide enough for the
+    last index so names never collide (and sort) beyond 10k frames."""
+    return max(4, len(str(max(num_frames - 1, 0))))
+
+
+def shard_manifest_name(shard_id: int = 0, num_shards: int = 1) -> str:
+    """Manifest filename for a render shard ('manifest.csv' when unsharded)."""
+    if num_shards <= 1:
+        return 'manifest.csv'
+    return f'manifest_shard{shard_id}of{num_shards}.csv'
+
+
+def shard_poses_name(shard_id: int = 0, num_shards: int = 1) -> str:
+    """Pose archive filename for a render shard ('poses.npz' when unsharded)."""
+    if num_shards <= 1:
+        return 'poses.npz'
+    return f'poses_shard{shard_id}of{num_shards}.npz'
+
+
+def is_up_to_date(src: str | Path, dst: str | Path) -> bool:
+    """True if `dst` exists and is not older than `src` (integer ns mtimes, so
+    files written in the same tick compare equal in every caller)."""
+    try:
+        return os.stat(dst).st_mtime_ns >= os.stat(src).st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+
+# Scene-level record of the parameters the depth viz PNGs were rendered with
+# (zmax, viz mode, ...); mtimes alone miss a config change
+VIZ_PARAMS_STAMP = '.depth_viz_params.json'
+
+
+def params_stamp_matches(path: str | Path, params: dict) -> bool:
+    """True if the JSON stamp at `path` records exactly `params`."""
+    try:
+        with open(path) as f:
+            return json.load(f) == json.loads(json.dumps(params))
+    except (FileNotFoundError, ValueError):
+        return False
+
+
+def write_params_stamp(path: str | Path, params: dict) -> None:
+    with open(path, 'w') as f:
+        json.dump(params, f, sort_keys=True)
+
+
+def iter_manifest_columns(
+    lines: Iterable[str], keys: Sequence[str]
+) -> Iterator[Tuple[str, ...]]:
+    """Yield the `keys` columns of each manifest row as a tuple, in `keys`
+    order. Columns are looked up by index (no dict per row); blank lines are
+    skipped, as csv.DictReader does. Missing columns raise KeyError upfront.
+    """
+    reader = csv.reader(lines)
+    header = next(reader, [])
+    missing = [k for k in keys if k not in header]
+    if missing:
+        raise KeyError(f'manifest must contain {", ".join(keys)}; missing: {missing}')
+    idx = [header.index(k) for k in keys]
+    pick = itemgetter(*idx) if len(idx) > 1 else lambda row: (row[idx[0]],)
+    for row in reader:
+        if row:
+            yield pick(row)
+
+
+def write_poses_npz(
+    path: str | Path,
+    frames: Sequence[int],
+    T_WC: Sequence[Matrix],
+    T_WD: Sequence[Matrix],
+    T_WO: Matrix,
+) -> None:
+    """All poses of a sequence in one binary file: 'frame' (N,), 'T_WC' and
+    'T_WD' (N, 4, 4), 'T_WO' (4, 4); float64, rows as in `write_matrix_txt`."""
+    import numpy as np  # only here: keeps this module light for the CLIs
+
+    np.savez(
+        path,
+        frame=np.asarray(frames, dtype=np.int64),
+        T_WC=np.asarray(T_WC, dtype=np.float64).reshape(-1, 4, 4),
+        T_WD=np.asarray(T_WD, dtype=np.float64).reshape(-1, 4, 4),
+        T_WO=np.asarray(T_WO, dtype=np.float64),
+    )
+
+
+# One '%' interpolation formats all 16 values (4 lines of 4 floats)
+_MATRIX_TXT_FMT = '%.9f %.9f %.9f %.9f\n' * 4
+
+
 def write_matrix_txt(path: str, M: Matrix):
     """Write a 4x4 matrix (row-major) as 4 lines of space-separated floats."""
+    text = _MATRIX_TXT_FMT % (*M[0], *M[1], *M[2], *M[3])
     with open(path, 'w') as f:
-        for r in range(4):
-            f.write(' '.join(f'{M[r][c]:.9f}' for c in range(4)) + '\n')
+        f.write(text)
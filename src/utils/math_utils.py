@@ -1,24 +1,62 @@
 # TODO: rename file to avoid confusion with mathutils in Blender?
 
-from typing import Tuple
+import math
+from functools import lru_cache
+from typing import List, Sequence, Tuple
 
 # --- Third-party (Blender) ---
+import numpy as np
 from mathutils import Matrix, Quaternion, Vector
 
 Vec3 = Tuple[float, float, float]
 QuatWXYZ = Tuple[float, float, float, float]
 
 
+@lru_cache(maxsize=256)
+def _scaled_se3_rows(p_xyz: Vec3, q_wxyz: QuatWXYZ, s_xyz: Vec3) -> tuple:
+    """Rows of T * R * S, with R from the closed-form (normalized) quaternion."""
+    w, x, y, z = q_wxyz
+    n = math.sqrt(w * w + x * x + y * y + z * z)
+    if n < 1e-12:
+        w, x, y, z = 1.0, 0.0, 0.0, 0.0
+    else:
+        w, x, y, z = w / n, x / n, y / n, z / n
+    sx, sy, sz = s_xyz
+    px, py, pz = p_xyz
+    return (
+        (
+            (1.0 - 2.0 * (y * y + z * z)) * sx,
+            2.0 * (x * y - w * z) * sy,
+            2.0 * (x * z + w * y) * sz,
+            px,
+        ),
+        (
+            2.0 * (x * y + w * z) * sx,
+            (1.0 - 2.0 * (x * x + z * z)) * sy,
+            2.0 * (y * z - w * x) * sz,
+            py,
+        ),
+        (
+            2.0 * (x * z - w * y) * sx,
+            2.0 * (y * z + w * x) * sy,
+            (1.0 - 2.0 * (x * x + y * y)) * sz,
+            pz,
+        ),
+        (0.0, 0.0, 0.0, 1.0),
+    )
+
+
+def _as_floats(v) -> tuple:
+    return tuple(float(c) for c in v)
+
+
 def make_se3_matrix(p_xyz: Vec3, q_wxyz: QuatWXYZ) -> Matrix:
     """Build 4x4 SE(3) from translation p, quaternion (w,x,y,z).
     Applies transform as:  T * R.
     """
-    # Rotation
-    Rot = Quaternion(q_wxyz).to_matrix().to_4x4()
-    # Translation
-    Trans = Matrix.Translation(Vector(p_xyz))
-
-    return Trans @ Rot
+    return Matrix(
+        _scaled_se3_rows(_as_floats(p_xyz), _as_floats(q_wxyz), (1.0, 1.0, 1.0))
+    )
 
 
 def make_scaled_se3_matrix(
@@ -28,15 +66,20 @@ def make_scaled_se3_matrix(
     Applies transform as:  T * R * S.
     Note: this way, the scale is applied in local frame
     """
-    T = make_se3_matrix(p_xyz, q_wxyz)
-    # Scale (non-uniform)
-    sx, sy, sz = map(float, s_xyz)
-    S = Matrix.Identity(4)
-    S[0][0] = sx
-    S[1][1] = sy
-    S[2][2] = sz
+    # Filled in closed form (no intermediate 3x3/4x4 products); memoized on inputs
+    return Matrix(
+        _scaled_se3_rows(_as_floats(p_xyz), _as_floats(q_wxyz), _as_floats(s_xyz))
+    )
+
 
-    return T @ S
+def invert_se3(T: Matrix) -> Matrix:
+    """Inverse of a rigid SE(3) transform: [R^T | -R^T p] (no general 4x4 inverse).
+    Only valid for orthonormal R (no scale/shear).
+    """
+    Rt = T.to_3x3().transposed()
+    T_inv = Rt.to_4x4()
+    T_inv.translation = -(Rt @ T.translation)
+    return T_inv
 
 
 def look_at_quaternion(eye: Vector, target: Vector) -> Quaternion:
@@ -46,3 +89,44 @@ def look_at_quaternion(eye: Vector, target: Vector) -> Quaternion:
         d = Vector((0, 0, -1))
     # Blender camera convention: forward = local -Z, up = local +Y
     return d.to_track_quat('-Z', 'Y')  # (w, x, y, z)
+
+
+def _look_at_array(eyes: Sequence[Vec3], targets: Sequence[Vec3]) -> np.ndarray:
+    """(N, 4, 4) world poses (T * R) of cameras at `eyes` looking at `targets`.
+    Same convention as `look_at_quaternion` (local -Z forward, +Y up-ish, no roll):
+    R = [right | up | -forward] with right = forward x Z_world, up = right x forward.
+    Near-vertical views, where the roll is not defined by Z_world, use the
+    scalar path.
+    """
+    E = np.asarray(eyes, dtype=np.float64).reshape(-1, 3)
+    D = np.asarray(targets, dtype=np.float64).reshape(-1, 3) - E
+    fwd = D / np.maximum(np.linalg.norm(D, axis=1, keepdims=True), 1e-12)
+    right = np.cross(fwd, (0.0, 0.0, 1.0))
+    right /= np.maximum(np.linalg.norm(right, axis=1, keepdims=True), 1e-12)
+    up = np.cross(right, fwd)
+
+    T = np.zeros((len(E), 4, 4))
+    T[:, :3, 0] = right
+    T[:, :3, 1] = up
+    T[:, :3, 2] = -fwd
+    T[:, :3, 3] = E
+    T[:, 3, 3] = 1.0
+
+    # to_track_quat picks its own roll when |dx| + |dy| < 1e-4 (near-vertical)
+    for k in np.flatnonzero(np.abs(D[:, 0]) + np.abs(D[:, 1]) < 1e-4):
+        q = look_at_quaternion(Vector(eyes[k]), Vector(targets[k]))
+        T[k] = make_se3_matrix(eyes[k], (q.w, q.x, q.y, q.z))
+    return T
+
+
+def look_at_rig_matrices(
+    eyes: Sequence[Vec3], targets: Sequence[Vec3], T_CD: Matrix
+) -> Tuple[List[Matrix], List[Matrix]]:
+    """Look-at poses T_WC and the rigidly attached T_WD = T_WC @ T_CD, both
+    computed as one batch (one broadcast matmul instead of N Matrix products)."""
+    T_WC = _look_at_array(eyes, targets)
+    T_WD = T_WC @ np.array(T_CD, dtype=np.float64)
+    return (
+        [Matrix(rows) for rows in T_WC.tolist()],
+        [Matrix(rows) for rows in T_WD.tolist()],
+    )
@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+
+class RenderCache:
+    """Frame-level render memoization stored in <scene_root>/.render_cache.jsonl.
+
+    Each rendered frame is recorded as {stem: {'key': ..., 'outputs': [...]}},
+    where the key hashes the camera poses and a scene signature. A frame whose
+    outputs exist with a matching key is skipped (resume after a crash); a frame
+    whose key matches another frame gets copies of that frame's files.
+
+    One file per render shard (shards run concurrently): a JSON line is
+    appended per finished frame, and the log is compacted when it is opened.
+    Use as a context manager (or call `close`) to release the log handle.
+    """
+
+    FILENAME = '.render_cache.jsonl'
+
+    def __init__(self, scene_root: str | Path, shard_id: int = 0, num_shards: int = 1):
+        name = self.FILENAME
+        if num_shards > 1:
+            name = f'.render_cache_shard{shard_id}of{num_shards}.jsonl'
+        self.path = Path(scene_root) / name
+        self.frames: Dict[str, dict] = {}
+        self._stem_by_key: Dict[str, str] = {}  # O(1) `find_source`
+        try:
+            with open(self.path) as f:
+                for line in f:
+                    try:
+                        e = json.loads(line)
+                        self.frames[e['stem']] = {
+                            'key': e['key'],
+                            'outputs': e['outputs'],
+                        }
+                    except (ValueError, KeyError, TypeError):
+                        continue  # torn last line after a crash → re-render it
+        except FileNotFoundError:
+            pass
+        self._compact()
+        for stem, e in self.frames.items():
+            self._stem_by_key[e['key']] = stem
+        self._log = open(self.path, 'a')
+
+    def __enter__(self) -> 'RenderCache':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _compact(self) -> None:
+        """Rewrite the log as one line per frame (unique temp file + replace)."""
+        with tempfile.NamedTemporaryFile(
+            'w', dir=self.path.parent, prefix=self.path.name, delete=False
+        ) as tmp:
+            for stem, e in self.frames.items():
+                tmp.write(self._line(stem, e['key'], e['outputs']))
+        os.replace(tmp.name, self.path)
+
+    @staticmethod
+    def _line(stem: str, key: str, outputs: List[str]) -> str:
+        return json.dumps({'stem': stem, 'key': key, 'outputs': outputs}) + '\n'
+
+    @staticmethod
+    def frame_key(matrices: Iterable, scene_sig: str) -> str:
+        """Hash 4x4 matrices (rounded to 1e-9) and the scene signature."""
+        h = hashlib.sha1(scene_sig.encode())
+        for M in matrices:
+            h.update(','.join(f'{float(v):.9f}' for row in M for v in row).encode())
+        return h.hexdigest()
+
+    def is_fresh(self, stem: str, key: str, outputs: List[str]) -> bool:
+        entry = self.frames.get(stem)
+        return (
+            entry is not None
+            and entry['key'] == key
+            and entry['outputs'] == list(outputs)
+            and all(os.path.exists(p) for p in outputs)
+        )
+
+    def find_source(self, key: str) -> Optional[List[str]]:
+        """Outputs of an already-rendered frame with the same key, if any."""
+        entry = self.frames.get(self._stem_by_key.get(key, ''))
+        if (
+            entry is not None
+            and entry['key'] == key  # the stem may have been re-recorded since
+            and all(os.path.exists(p) for p in entry['outputs'])
+        ):
+            return entry['outputs']
+        return None
+
+    @staticmethod
+    def copy_outputs(src: List[str], dst: List[str]) -> None:
+        """Copy each src file to the matching dst path. Not hardlinks: the noise
+        pass rewrites GT EXRs in place from parallel workers, and a shared
+        inode would be truncated under a reader of the other frame."""
+        for s, d in zip(src, dst):
+            if os.path.abspath(s) == os.path.abspath(d):
+                continue
+            if os.path.exists(d):
+                os.remove(d)  # may be a hardlink to `s` from an older run
+            shutil.copy2(s, d)
+
+    def record(self, stem: str, key: str, outputs: List[str]) -> None:
+        """Remember a finished frame: one appended line, flushed (crash-safe
+        resume without rewriting the whole map per frame)."""
+        self.frames[stem] = {'key': key, 'outputs': list(outputs)}
+        self._stem_by_key[key] = stem
+        self._log.write(self._line(stem, key, list(outputs)))
+        self._log.flush()
+
+    def close(self) -> None:
+        self._log.close()
@@ -0,0 +1,33 @@
+import unittest
+
+from src.config.config_parser import _parse_render
+
+_RENDER = {
+    'out_dir': './outputs',
+    'scene_id': 's',
+    'width': 64,
+    'height': 48,
+    'zmax_m': 6.0,
+}
+
+
+class ParseRenderTest(unittest.TestCase):
+    def test_depth_viz_mode_defaults_to_linear(self):
+        r = _parse_render(dict(_RENDER))
+        self.assertEqual(r.depth_viz_mode, 'linear')
+        self.assertEqual(r.depth_viz_znear_m, 0.0)
+
+    def test_disparity_mode_and_znear(self):
+        r = _parse_render(
+            dict(_RENDER, depth_viz_mode='Disparity', depth_viz_znear_m=0.2)
+        )
+        self.assertEqual(r.depth_viz_mode, 'disparity')
+        self.assertEqual(r.depth_viz_znear_m, 0.2)
+
+    def test_unknown_mode_is_rejected(self):
+        with self.assertRaises(ValueError):
+            _parse_render(dict(_RENDER, depth_viz_mode='log'))
+
+
+if __name__ == '__main__':
+    unittest.main()
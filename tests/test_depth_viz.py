@@ -0,0 +1,35 @@
+import importlib.util
+import unittest
+
+import numpy as np
+
+HAVE_CV2 = importlib.util.find_spec('cv2') is not None
+
+
+@unittest.skipUnless(HAVE_CV2, 'depth_viz imports OpenCV')
+class DisparityCodeTest(unittest.TestCase):
+    def test_documented_inverse_round_trips(self):
+        from src.improc.depth_viz import depth_to_disparity_u16
+
+        znear, zmax = 0.1, 6.0
+        d = np.linspace(znear, zmax, 1000, dtype=np.float32).reshape(20, 50)
+        y = depth_to_disparity_u16(d, znear, zmax).astype(np.float64)
+        inv_far = 1.0 / zmax
+        z = 1.0 / ((y - 2) / (2**16 - 3) * (1.0 / znear - inv_far) + inv_far)
+        # one code step in 1/z, expressed in meters at each depth
+        step = d.astype(np.float64) ** 2 * (1.0 / znear - inv_far) / (2**16 - 3)
+        self.assertTrue(np.all(np.abs(z - d) <= step))
+        self.assertEqual(y.min(), 2)
+        self.assertEqual(y.max(), 65535)
+
+    def test_reserved_codes(self):
+        from src.improc.depth_viz import depth_to_disparity_u16
+
+        d = np.array([[np.nan, -1.0, 0.0, 0.05, 7.0, 1.0]], dtype=np.float32)
+        y = depth_to_disparity_u16(d, 0.1, 6.0)
+        np.testing.assert_array_equal(y[0, :5], [1, 1, 1, 0, 0])
+        self.assertGreaterEqual(y[0, 5], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.utils.io_utils import (
+    VIZ_PARAMS_STAMP,
+    params_stamp_matches,
+    write_params_stamp,
+)
+
+
+class ParamsStampTest(unittest.TestCase):
+    def test_stamp_matches_only_the_written_params(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            stamp = Path(tmp) / VIZ_PARAMS_STAMP
+            params = {'zmax_m': 3.0, 'invalid_color': (0, 180, 0)}
+            self.assertFalse(params_stamp_matches(stamp, params))
+            write_params_stamp(stamp, params)
+            self.assertTrue(params_stamp_matches(stamp, params))  # tuple vs list
+            self.assertFalse(params_stamp_matches(stamp, {**params, 'zmax_m': 5.0}))
+            self.assertFalse(
+                params_stamp_matches(stamp, {'mode': 'disparity', 'znear_m': 0.1})
+            )
+
+    def test_torn_stamp_does_not_match(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            stamp = Path(tmp) / VIZ_PARAMS_STAMP
+            stamp.write_text('{"zmax_m": 3.')
+            self.assertFalse(params_stamp_matches(stamp, {'zmax_m': 3.0}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.utils.render_cache import RenderCache
+
+
+class RenderCacheTest(unittest.TestCase):
+    def test_shards_use_separate_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with RenderCache(tmp, 0, 2) as a, RenderCache(tmp, 1, 2) as b:
+                a.record('frame_0000', 'k0', [])
+                b.record('frame_0001', 'k1', [])
+            self.assertNotEqual(a.path, b.path)
+            with RenderCache(tmp, 0, 2) as a, RenderCache(tmp, 1, 2) as b:
+                self.assertEqual(set(a.frames), {'frame_0000'})
+                self.assertEqual(set(b.frames), {'frame_0001'})
+
+    def test_reload_keeps_last_entry_and_drops_torn_line(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with RenderCache(tmp) as c:
+                c.record('frame_0000', 'old', [])
+                c.record('frame_0000', 'new', [])
+            with open(c.path, 'a') as f:
+                f.write('{"stem": "frame_0001", "ke')  # crash mid-write
+            with RenderCache(tmp) as c:
+                pass
+            self.assertEqual(c.frames, {'frame_0000': {'key': 'new', 'outputs': []}})
+            self.assertEqual(len(Path(c.path).read_text().splitlines()), 1)
+            self.assertEqual(sorted(p.name for p in Path(tmp).iterdir()), [c.path.name])
+
+    def test_find_source_follows_latest_key(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            out = Path(tmp) / 'rgb_0000.png'
+            out.touch()
+            with RenderCache(tmp) as c:
+                c.record('frame_0000', 'k0', [str(out)])
+                self.assertEqual(c.find_source('k0'), [str(out)])
+                c.record('frame_0000', 'k1', [str(out)])  # re-rendered, new pose
+                self.assertIsNone(c.find_source('k0'))
+            with RenderCache(tmp) as c:
+                self.assertEqual(c.find_source('k1'), [str(out)])
+
+    def test_copy_outputs_breaks_hardlinks(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            src, dst = Path(tmp) / 'a.exr', Path(tmp) / 'b.exr'
+            src.write_bytes(b'gt')
+            os.link(src, dst)  # left by an older run that hardlinked
+            RenderCache.copy_outputs([str(src)], [str(dst)])
+            self.assertNotEqual(src.stat().st_ino, dst.stat().st_ino)
+            self.assertEqual(dst.read_bytes(), b'gt')
+
+
+if __name__ == '__main__':
+    unittest.main()
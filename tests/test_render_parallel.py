@@ -0,0 +1,71 @@
+import csv
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from src.render_parallel import merge_shard_manifests, merge_shard_poses
+from src.utils.io_utils import shard_manifest_name, shard_poses_name
+
+
+def _write_shard_manifests(scene_root, frames_per_shard):
+    for s, frames in enumerate(frames_per_shard):
+        path = scene_root / shard_manifest_name(s, len(frames_per_shard))
+        with path.open('w', newline='') as f:
+            w = csv.writer(f)
+            w.writerow(('frame', 'rgb'))
+            w.writerows((k, f'rgb/frame_{k:04d}.png') for k in frames)
+
+
+class MergeShardManifestsTest(unittest.TestCase):
+    def test_rows_are_merged_in_frame_order(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            scene_root = Path(tmp)
+            _write_shard_manifests(scene_root, [(0, 2, 4), (1, 3)])
+            manifest = merge_shard_manifests(scene_root, 2, 5)
+            with manifest.open(newline='') as f:
+                frames = [int(r['frame']) for r in csv.DictReader(f)]
+            self.assertEqual(frames, [0, 1, 2, 3, 4])
+
+    def test_missing_frames_fail_the_merge(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            scene_root = Path(tmp)
+            _write_shard_manifests(scene_root, [(0, 2, 4), (1,)])  # frame 3 lost
+            with self.assertRaises(RuntimeError):
+                merge_shard_manifests(scene_root, 2, 5)
+            self.assertFalse((scene_root / 'manifest.csv').exists())
+
+
+class MergeShardPosesTest(unittest.TestCase):
+    def test_shards_are_merged_in_frame_order(self):
+        n_frames, num_shards = 7, 3
+        T_WO = np.eye(4)
+        with tempfile.TemporaryDirectory() as tmp:
+            scene_root = Path(tmp)
+            (scene_root / 'poses').mkdir()
+            for s in range(num_shards):
+                frames = np.arange(s, n_frames, num_shards)
+                T = np.tile(np.eye(4), (len(frames), 1, 1))
+                T[:, 0, 3] = frames  # tag each pose with its frame
+                np.savez(
+                    scene_root / 'poses' / shard_poses_name(s, num_shards),
+                    frame=frames,
+                    T_WC=T,
+                    T_WD=T + 1.0,
+                    T_WO=T_WO,
+                )
+            merged = merge_shard_poses(scene_root, num_shards)
+            with np.load(merged) as z:
+                np.testing.assert_array_equal(z['frame'], np.arange(n_frames))
+                np.testing.assert_array_equal(z['T_WC'][:, 0, 3], np.arange(n_frames))
+                np.testing.assert_array_equal(z['T_WD'], z['T_WC'] + 1.0)
+                np.testing.assert_array_equal(z['T_WO'], T_WO)
+            self.assertEqual(
+                sorted(p.name for p in (scene_root / 'poses').iterdir()),
+                ['poses.npz'],
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()